@@ -0,0 +1,215 @@
+"""
+Resumable batch runner: streams request specs from a JSONL file, runs them
+through HTTPClient with bounded concurrency and appends one result line per
+request to an output JSONL log.
+
+    python batch_runner.py requests.jsonl results.jsonl --url http://127.0.0.1:8080/v1/completions -c 64
+
+Each input line is a JSON object. `method`, `url`, `json`, `data`,
+`headers`, `params`, `max_retries` and `request_timeout` are passed to the
+client (`--method`/`--url` fill in missing ones); when a line has no
+`json` or `data` body, its remaining fields are sent as the JSON body.
+`request_id` or `id` is copied to the output for joining.
+
+The output is append-only. Rerunning the same command after a crash or
+Ctrl-C skips every input line that already has a successful result and
+retries the rest; for a given line the last record in the output wins.
+Memory use depends on the concurrency, not on the file size: the input
+is read lazily and completed lines are tracked in a one-bit-per-line map.
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+
+from http_client import HTTPClient
+
+REQUEST_KEYS = ("method", "url", "json", "data", "headers", "params", "max_retries", "request_timeout")
+
+class LineBitmap:
+    """Set of non-negative line numbers stored as one bit each."""
+
+    def __init__(self):
+        self._bits = bytearray()
+        self.count = 0
+
+    def add(self, line):
+        byte, bit = divmod(line, 8)
+        if byte >= len(self._bits):
+            self._bits.extend(bytes(byte - len(self._bits) + 1024))
+        if not self._bits[byte] & (1 << bit):
+            self._bits[byte] |= 1 << bit
+            self.count += 1
+
+    def __contains__(self, line):
+        byte, bit = divmod(line, 8)
+        return byte < len(self._bits) and bool(self._bits[byte] & (1 << bit))
+
+
+def load_completed(output_path) -> LineBitmap:
+    """
+    Scan an existing output log for successful lines. A torn last record
+    from a crash mid-write is truncated so new records start on a clean line.
+    """
+    done = LineBitmap()
+    if not os.path.exists(output_path):
+        return done
+    valid_end = 0
+    with open(output_path, "rb") as f:
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            valid_end += len(raw)
+            try:
+                record = json.loads(raw)
+            except ValueError:
+                continue
+            if record.get("ok"):
+                done.add(record["line"])
+    if valid_end != os.path.getsize(output_path):
+        with open(output_path, "r+b") as f:
+            f.truncate(valid_end)
+    return done
+
+def count_lines(path) -> int:
+    count = 0
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            count += block.count(b"\n")
+    return count
+
+def to_request(record, default_method, default_url):
+    spec = {key: record[key] for key in REQUEST_KEYS if key in record}
+    spec.setdefault("method", default_method)
+    spec.setdefault("url", default_url)
+    if spec["url"] is None:
+        raise ValueError("line has no 'url' and no --url was given")
+    if "json" not in spec and "data" not in spec:
+        spec["json"] = {k: v for k, v in record.items() if k not in REQUEST_KEYS and k not in ("id", "request_id")}
+    return spec
+
+
+class Progress:
+    def __init__(self, total, skipped, interval, stream=sys.stderr):
+        self.total = total
+        self.skipped = skipped
+        self.interval = interval
+        self.stream = stream
+        self.ok = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self._last = 0.0
+
+    def update(self, ok, force=False):
+        if ok:
+            self.ok += 1
+        else:
+            self.failed += 1
+        now = time.monotonic()
+        if force or now - self._last >= self.interval:
+            self._last = now
+            self.report(now)
+
+    def report(self, now=None):
+        elapsed = (now or time.monotonic()) - self.started
+        finished = self.ok + self.failed
+        rate = finished / elapsed if elapsed else 0.0
+        line = f"{self.skipped + finished}"
+        if self.total:
+            remaining = max(0, self.total - self.skipped - finished)
+            eta = remaining / rate if rate else float("inf")
+            line += f"/{self.total} ({(self.skipped + finished) / self.total:.1%}) eta {eta:,.0f}s"
+        line += f"  ok {self.ok}  failed {self.failed}  skipped {self.skipped}  {rate:,.1f} req/s"
+        print(line, file=self.stream, flush=True)
+
+
+class BatchRunner:
+    def __init__(self, client, input_path, output_path, concurrency=32, method="POST", url=None,
+                 progress_interval=5.0, fsync_every=1000):
+        self.client = client
+        self.input_path = input_path
+        self.output_path = output_path
+        self.concurrency = concurrency
+        self.method = method
+        self.url = url
+        self.progress_interval = progress_interval
+        self.fsync_every = fsync_every
+
+    async def _run_one(self, line, raw, out, progress):
+        started = time.monotonic()
+        result = {"line": line, "id": None}
+        try:
+            record = json.loads(raw)
+            result["id"] = record.get("request_id", record.get("id"))
+            spec = to_request(record, self.method, self.url)
+            result["result"] = await self.client.arequest(spec.pop("method"), spec.pop("url"), **spec)
+            result["ok"] = True
+        except Exception as exc:
+            result["ok"] = False
+            result["error"] = f"{type(exc).__name__}: {exc}"
+        result["elapsed_s"] = round(time.monotonic() - started, 4)
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+        progress.update(result["ok"])
+
+    async def run(self):
+        done = load_completed(self.output_path)
+        total = count_lines(self.input_path)
+        progress = Progress(total, done.count, self.progress_interval)
+        # Bounds both in-flight requests and lines read ahead of them
+        slots = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+        written = 0
+
+        def release(task):
+            tasks.discard(task)
+            slots.release()
+
+        with open(self.input_path, "rb") as src, open(self.output_path, "a") as out:
+            try:
+                for line, raw in enumerate(src):
+                    if line in done or not raw.strip():
+                        continue
+                    await slots.acquire()
+                    task = asyncio.ensure_future(self._run_one(line, raw, out, progress))
+                    tasks.add(task)
+                    task.add_done_callback(release)
+                    written += 1
+                    if self.fsync_every and written % self.fsync_every == 0:
+                        os.fsync(out.fileno())
+                await asyncio.gather(*tasks)
+            finally:
+                # On Ctrl-C, unfinished requests simply have no record and run again next time
+                for task in tasks:
+                    task.cancel()
+                out.flush()
+                os.fsync(out.fileno())
+        progress.report()
+        return progress
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--url", help="default URL for lines without one")
+    parser.add_argument("--method", default="POST")
+    parser.add_argument("-c", "--concurrency", type=int, default=32)
+    parser.add_argument("--per-host", type=int, default=None, help="connection limit per host")
+    parser.add_argument("--progress-interval", type=float, default=5.0)
+    args = parser.parse_args()
+
+    limit_per_host = args.per_host or args.concurrency
+    with HTTPClient(limit=max(args.concurrency, limit_per_host), limit_per_host=limit_per_host) as client:
+        runner = BatchRunner(client, args.input, args.output, args.concurrency, args.method, args.url,
+                             args.progress_interval)
+        try:
+            asyncio.run(runner.run())
+        except KeyboardInterrupt:
+            print("Interrupted; rerun the same command to resume.", file=sys.stderr)
+            sys.exit(130)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Benchmark: requests/sec of the pooled HTTPClient against the old
+per-call behaviour (new event loop + new ClientSession on every request).
+
+Run from the v/ directory:
+    python bench_http_client.py --requests 500
+"""
+import time
+import socket
+import asyncio
+import argparse
+import threading
+import aiohttp
+from aiohttp import web
+
+from http_client import HTTPClient
+
+def start_local_server():
+    """Start a tiny JSON server on a free localhost port in a background thread."""
+    async def handle(request):
+        return web.json_response({"ok": True})
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    loop = asyncio.new_event_loop()
+
+    async def serve():
+        app = web.Application()
+        app.router.add_post("/v1/completions", handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.SockSite(runner, sock).start()
+
+    loop.run_until_complete(serve())
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return f"http://127.0.0.1:{port}/v1/completions"
+
+def legacy_request(method, url, **kwargs):
+    """The pre-pool implementation: one event loop and one session per call."""
+    async def async_request():
+        async with aiohttp.ClientSession() as session:
+            async with session.request(method=method, url=url, **kwargs) as response:
+                return await response.json()
+    return asyncio.run(async_request())
+
+def bench(name, fn, n):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<10} {n} requests in {elapsed:.2f}s -> {n / elapsed:,.0f} req/s")
+    return n / elapsed
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    url = start_local_server()
+    payload = {"prompt": "hello", "max_tokens": 1}
+
+    legacy = bench("legacy", lambda: legacy_request("POST", url, json=payload), args.requests)
+    with HTTPClient() as client:
+        pooled = bench("pooled", lambda: client.request("POST", url, json=payload), args.requests)
+    print(f"speedup    {pooled / legacy:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Microbenchmark: parsing throughput (tokens/sec) of the bytes-level
+StreamParser against the old decode-then-json.loads line loop, each with the
+stdlib decoder and with orjson.
+
+The input is a recorded OpenAI-style chat completion stream, replayed in
+randomly sized network chunks. Pass --file to use your own capture
+(raw text/event-stream body), otherwise a synthetic one is generated.
+
+Run from the v/ directory:
+    python bench_sse.py --tokens 50000
+The orjson rows need the optional `pip install orjson`; they are skipped without it.
+"""
+import json
+import time
+import random
+import argparse
+
+from sse import DONE, StreamParser, get_json_loads, orjson
+
+WORDS = ["revenue", " grew", " 12%", " year", "-over-", "year", " to", " €4.2bn", ",", " 株価", " rose", "."]
+
+def record_stream(tokens):
+    """Build a chat completion SSE body with one token per event."""
+    parts = []
+    for i in range(tokens):
+        chunk = {
+            "id": "chatcmpl-bench",
+            "object": "chat.completion.chunk",
+            "model": "gpt-4o",
+            "choices": [{"index": 0, "delta": {"content": WORDS[i % len(WORDS)]}, "finish_reason": None}],
+        }
+        parts.append("data: " + json.dumps(chunk, ensure_ascii=False) + "\n\n")
+        if i % 200 == 0:
+            parts.append(": keep-alive\n\n")
+    parts.append("data: [DONE]\n\n")
+    return "".join(parts).encode("utf-8")
+
+def split_chunks(body, seed=0):
+    """Cut the body at random offsets, including inside UTF-8 sequences."""
+    rng = random.Random(seed)
+    chunks, pos = [], 0
+    while pos < len(body):
+        size = rng.randint(1, 1024)
+        chunks.append(body[pos:pos + size])
+        pos += size
+    return chunks
+
+def legacy_parse(chunks, loads=json.loads):
+    """Reassemble lines, decode to str, strip the SSE prefix and json.loads each one."""
+    count, pending = 0, b""
+    for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            decoded_chunk = line.decode("utf-8").strip()
+            if not decoded_chunk or decoded_chunk.startswith(":"):
+                continue
+            if decoded_chunk.startswith("data: "):
+                decoded_chunk = decoded_chunk[6:]
+            if decoded_chunk == "[DONE]":
+                return count
+            loads(decoded_chunk)
+            count += 1
+    return count
+
+def parser_parse(chunks, loads):
+    count = 0
+    parser = StreamParser()
+    for chunk in chunks:
+        for event in parser.feed(chunk):
+            if event.data == DONE:
+                return count
+            loads(event.data)
+            count += 1
+    return count
+
+def bench(name, fn, chunks, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        tokens = fn(chunks)
+        best = min(best, time.perf_counter() - start)
+    print(f"{name:<18} {tokens / best:>12,.0f} tokens/s")
+    return tokens / best
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tokens", type=int, default=50000)
+    parser.add_argument("--file", help="recorded text/event-stream body to replay")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.file:
+        with open(args.file, "rb") as f:
+            body = f.read()
+    else:
+        body = record_stream(args.tokens)
+    chunks = split_chunks(body)
+    print(f"{len(body):,} bytes in {len(chunks):,} chunks")
+
+    legacy = bench("legacy str+json", legacy_parse, chunks, args.repeat)
+    bench("parser+json", lambda c: parser_parse(c, get_json_loads(fast=False)), chunks, args.repeat)
+    if orjson is not None:
+        legacy_fast = bench("legacy str+orjson", lambda c: legacy_parse(c, orjson.loads), chunks, args.repeat)
+        fast = bench("parser+orjson", lambda c: parser_parse(c, get_json_loads()), chunks, args.repeat)
+        print(f"speedup            {fast / legacy:.1f}x vs legacy, {fast / legacy_fast:.1f}x vs legacy with orjson")
+    else:
+        print("orjson not installed; skipping fast decoder")
+
+if __name__ == "__main__":
+    main()
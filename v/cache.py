@@ -0,0 +1,251 @@
+import json
+import time
+import asyncio
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+from counters import Counters
+
+# Headers that change what the server returns; values are hashed, never stored
+DEFAULT_KEY_HEADERS = ("authorization", "api-key", "content-type", "accept")
+
+def cache_key(method, url, params=None, json=None, data=None, headers=None, key_headers=DEFAULT_KEY_HEADERS, **_):
+    """
+    Canonical SHA-256 key for a request: method, URL, query params, body and
+    the selected headers. JSON bodies are serialised with sorted keys so
+    logically equal payloads share a key.
+    """
+    selected = {}
+    if headers:
+        wanted = {h.lower() for h in key_headers}
+        selected = {k.lower(): v for k, v in headers.items() if k.lower() in wanted}
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    canonical = _dumps({
+        "method": method.upper(),
+        "url": str(url),
+        "params": sorted(params.items()) if isinstance(params, dict) else params,
+        "json": json,
+        "data": hashlib.sha256(data).hexdigest() if isinstance(data, (bytes, bytearray)) else data,
+        "headers": selected,
+    })
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def _dumps(value):
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class CacheStats(Counters):
+    """Thread-safe hit/miss counters."""
+
+    FIELDS = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expired": 0}
+
+    def _snapshot(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return dict(super()._snapshot(), hits=hits, hit_rate=hits / lookups if lookups else 0.0)
+
+
+class MemoryCache:
+    """
+    In-memory LRU tier bounded by entry count and total payload bytes.
+    Entries carry an absolute `expires_at` (time.time(), None for never) so
+    one promoted from the disk tier keeps its original expiry.
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024, stats=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = stats or CacheStats()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the stored payload bytes, or None on miss or expiry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            payload, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                self._remove(key)
+                self.stats.add(expired=1)
+                return None
+            self._entries.move_to_end(key)
+            return payload
+
+    def set(self, key, payload, expires_at=None):
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (payload, expires_at)
+            self._bytes += len(payload)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.stats.add(evictions=1)
+
+    def _remove(self, key):
+        payload, _ = self._entries.pop(key)
+        self._bytes -= len(payload)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+class SQLiteCache:
+    """
+    Persistent tier in a single SQLite file that any number of processes can
+    share: WAL mode, a busy timeout instead of lock errors, and size-based
+    LRU eviction done in one transaction so concurrent evictors agree.
+    """
+
+    def __init__(self, path="http_cache.sqlite", max_bytes=1024 * 1024 * 1024, stats=None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.stats = stats or CacheStats()
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._init_schema(deadline=time.monotonic() + 30)
+
+    def _init_schema(self, deadline):
+        # Switching to WAL does not wait on the busy timeout, so processes opening
+        # a fresh file at the same moment retry here instead of failing
+        while True:
+            try:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS entries ("
+                    "key TEXT PRIMARY KEY, payload BLOB NOT NULL, size INTEGER NOT NULL, "
+                    "expires_at REAL, accessed_at REAL NOT NULL)"
+                )
+                self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+                return
+            except sqlite3.OperationalError as e:
+                if "locked" not in str(e) or time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+
+    def get(self, key):
+        """Return (payload bytes, expires_at), or None on miss or expiry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT payload, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            payload, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM entries WHERE key = ? AND expires_at <= ?", (key, now))
+                self.stats.add(expired=1)
+                return None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            return bytes(payload), expires_at
+
+    def set(self, key, payload, expires_at=None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (key, payload, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, payload, len(payload), expires_at, now),
+                )
+                self._evict(now)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self, now):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        self._conn.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY accessed_at").fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            self.stats.add(evictions=1)
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """
+    Opt-in two-tier cache for deterministic requests: an in-memory LRU in
+    front of an optional SQLite tier. Values are decoded JSON bodies or, for
+    streaming calls, the list of chunks so they can be replayed as a stream.
+    """
+
+    def __init__(self, memory=None, disk=None, ttl=None, key_headers=DEFAULT_KEY_HEADERS):
+        self.stats = CacheStats()
+        self.memory = memory if memory is not None else MemoryCache()
+        self.disk = disk
+        self.ttl = ttl
+        self.key_headers = key_headers
+        for tier in (self.memory, self.disk):
+            if tier is not None:
+                tier.stats = self.stats
+
+    def key(self, method, url, stream=False, **kwargs):
+        """Cache key for a request; streamed and buffered variants are kept apart."""
+        key = cache_key(method, url, key_headers=self.key_headers, **kwargs)
+        return key + ":stream" if stream else key
+
+    def get(self, key):
+        """Return the cached value, or None on a miss."""
+        payload = self.memory.get(key)
+        if payload is not None:
+            self.stats.add(memory_hits=1)
+            return json.loads(payload)
+        if self.disk is not None:
+            row = self.disk.get(key)
+            if row is not None:
+                payload, expires_at = row
+                self.stats.add(disk_hits=1)
+                self.memory.set(key, payload, expires_at)
+                return json.loads(payload)
+        self.stats.add(misses=1)
+        return None
+
+    def set(self, key, value):
+        payload = json.dumps(value, separators=(",", ":")).encode("utf-8")
+        expires_at = time.time() + self.ttl if self.ttl else None
+        self.memory.set(key, payload, expires_at)
+        if self.disk is not None:
+            self.disk.set(key, payload, expires_at)
+        self.stats.add(stores=1)
+
+    async def aget(self, key):
+        if self.disk is None:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key, value):
+        if self.disk is None:
+            return self.set(key, value)
+        await asyncio.to_thread(self.set, key, value)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
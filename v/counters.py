@@ -0,0 +1,28 @@
+import threading
+
+class Counters:
+    """
+    Thread-safe counters shared by the client's stats objects. Subclasses
+    name their counters and starting values in FIELDS, bump them with
+    add(**deltas) and may extend _snapshot() with derived values; it runs
+    under the lock, so a snapshot is always consistent.
+    """
+
+    FIELDS = {}
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        for name, initial in self.FIELDS.items():
+            setattr(self, name, initial)
+
+    def add(self, **deltas):
+        with self._lock:
+            for name, delta in deltas.items():
+                setattr(self, name, getattr(self, name) + delta)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self) -> dict:
+        return {name: getattr(self, name) for name in self.FIELDS}
@@ -0,0 +1,211 @@
+import time
+import asyncio
+import itertools
+import threading
+from collections import deque
+
+class CircuitOpenError(RuntimeError):
+    """Raised when every endpoint's circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint breaker: opens after `failure_threshold` consecutive
+    failures, lets a single probe through after `reset_timeout` seconds
+    (half-open) and closes again on the first success. A probe that ends
+    without a verdict (cancelled, or a non-retryable error) is released so
+    the next request probes again; one that never reports back is given up
+    after another `reset_timeout`.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started = 0.0
+        self.trips = 0
+        self._lock = threading.Lock()
+
+    def available(self) -> bool:
+        """Whether allow() would currently let a request through; changes no state."""
+        with self._lock:
+            return self._available(time.monotonic())
+
+    def _available(self, now):
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN:
+            return now - self.opened_at >= self.reset_timeout
+        return now - self.probe_started >= self.reset_timeout
+
+    def allow(self) -> bool:
+        """Admit a request that is about to be sent; in half-open state only the single probe."""
+        with self._lock:
+            now = time.monotonic()
+            if not self._available(now):
+                return False
+            if self.state != self.CLOSED:
+                self.state = self.HALF_OPEN
+                self.probe_started = now
+            return True
+
+    def release(self):
+        """The admitted request ended without telling whether the endpoint is healthy."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                # Back to open, but due for another probe right away
+                self.state = self.OPEN
+                self.opened_at = time.monotonic() - self.reset_timeout
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.trips += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class LatencyTracker:
+    """Sliding window of recent latencies used to pick the hedge delay."""
+
+    def __init__(self, window=1000, min_samples=20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct):
+        """Latency at `pct` (0-100), or None until `min_samples` have been seen."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100.0))]
+
+
+class HedgedClient:
+    """
+    Sends each request to one of several equivalent deployments of a model.
+    If the first attempt has not answered after the `hedge_percentile`
+    latency (or `hedge_delay` until enough samples exist), a duplicate goes
+    to another healthy endpoint; the first success wins and the loser is
+    cancelled. Failing endpoints are taken out of rotation by their
+    CircuitBreaker so traffic drains to healthy nodes. Attempts bypass the
+    client's SingleFlight (its shared call would keep running after the
+    loser is cancelled) and its response cache (a hit says nothing about
+    the endpoint's latency or health).
+    """
+
+    def __init__(self, client, endpoints, hedge_percentile=95, hedge_delay=1.0, max_hedges=1,
+                 failure_threshold=5, reset_timeout=30.0, max_retries_per_endpoint=0):
+        self.client = client
+        self.endpoints = [endpoint.rstrip("/") for endpoint in endpoints]
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay = hedge_delay
+        self.max_hedges = max_hedges
+        self.max_retries_per_endpoint = max_retries_per_endpoint
+        self.breakers = {e: CircuitBreaker(failure_threshold, reset_timeout) for e in self.endpoints}
+        self.latency = LatencyTracker()
+        self.stats = {"requests": 0, "hedges": 0, "hedge_wins": 0, "cancelled": 0}
+        self._next = itertools.count()
+
+    def current_hedge_delay(self):
+        return self.latency.percentile(self.hedge_percentile) or self.hedge_delay
+
+    def _candidates(self):
+        """
+        Endpoints whose breaker would admit a request, rotated so load is
+        spread round-robin. Breakers are only consulted here; allow() is
+        called when an attempt is actually launched.
+        """
+        start = next(self._next) % len(self.endpoints)
+        rotated = self.endpoints[start:] + self.endpoints[:start]
+        return [endpoint for endpoint in rotated if self.breakers[endpoint].available()]
+
+    def _launch(self, candidates, method, path, kwargs):
+        """Start an attempt on the next candidate its breaker admits, or return None."""
+        while candidates:
+            endpoint = candidates.pop(0)
+            if self.breakers[endpoint].allow():
+                return asyncio.ensure_future(self._attempt(endpoint, method, path, kwargs))
+        return None
+
+    async def _attempt(self, endpoint, method, path, kwargs):
+        started = time.monotonic()
+        try:
+            result = await self.client._request(method, endpoint + path,
+                                                max_retries=self.max_retries_per_endpoint,
+                                                **dict(kwargs, coalesce=False, use_cache=False))
+        except asyncio.CancelledError:
+            # Lost the hedge race: says nothing about the endpoint's health
+            self.breakers[endpoint].release()
+            raise
+        except Exception as exc:
+            if self.client.retry_policy.is_retryable(exc):
+                self.breakers[endpoint].record_failure()
+            else:
+                self.breakers[endpoint].release()
+            raise
+        self.breakers[endpoint].record_success()
+        self.latency.record(time.monotonic() - started)
+        return result
+
+    async def _hedged(self, method, path, kwargs):
+        self.stats["requests"] += 1
+        candidates = self._candidates()
+        primary = self._launch(candidates, method, path, kwargs)
+        if primary is None:
+            raise CircuitOpenError(f"All {len(self.endpoints)} endpoints have an open circuit breaker.")
+        pending = {primary}
+        launched = 1
+        last_error = None
+        try:
+            while pending:
+                # Wait for an answer, but no longer than the hedge delay if a backup is still available
+                can_hedge = launched <= self.max_hedges and candidates
+                timeout = self.current_hedge_delay() if can_hedge else None
+                done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.stats["hedge_wins"] += 1
+                        return task.result()
+                    last_error = task.exception()
+                if launched <= self.max_hedges:
+                    # Either the delay expired or an attempt failed: fire the next endpoint now
+                    task = self._launch(candidates, method, path, kwargs)
+                    if task is not None:
+                        pending.add(task)
+                        launched += 1
+                        self.stats["hedges"] += 1
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+                self.stats["cancelled"] += 1
+
+    async def arequest(self, method, path, **kwargs):
+        """Hedged request for `path` relative to the endpoints; safe to await from any loop."""
+        return await self.client._on_loop(self._hedged(method, path, kwargs))
+
+    def request(self, method, path, **kwargs):
+        """Blocking counterpart of `arequest`."""
+        return self.client.run(self._hedged(method, path, kwargs))
+
+    def health(self) -> dict:
+        """Breaker state and consecutive failures per endpoint."""
+        return {e: {"state": b.state, "failures": b.failures, "trips": b.trips} for e, b in self.breakers.items()}
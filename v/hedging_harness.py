@@ -0,0 +1,127 @@
+"""
+Harness for HedgedClient: starts local fake model servers that inject
+latency and errors, then compares tail latency with and without hedging
+and shows the circuit breaker draining traffic away from a broken node.
+Finally it checks that a node whose breaker opened gets traffic again
+after it recovers (exits with an AssertionError if not).
+
+Run from the v/ directory:
+    python hedging_harness.py --requests 300
+"""
+import time
+import random
+import socket
+import asyncio
+import argparse
+import threading
+from aiohttp import web
+
+from http_client import HTTPClient
+from hedging import HedgedClient
+
+def start_fake_server(base_latency, slow_fraction=0.0, slow_latency=0.0, error_rate=0.0, seed=0):
+    """
+    Start a fake /v1/completions server in a background thread and return its
+    base URL and a dict with the served count; its "error_rate" can be changed live.
+    """
+    rng = random.Random(seed)
+    served = {"count": 0, "error_rate": error_rate}
+
+    async def handle(request):
+        served["count"] += 1
+        if rng.random() < served["error_rate"]:
+            return web.json_response({"error": "unavailable"}, status=503)
+        delay = slow_latency if rng.random() < slow_fraction else base_latency * rng.uniform(0.5, 1.5)
+        await asyncio.sleep(delay)
+        return web.json_response({"choices": [{"text": "ok"}]})
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    loop = asyncio.new_event_loop()
+
+    async def serve():
+        app = web.Application()
+        app.router.add_post("/v1/completions", handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.SockSite(runner, sock).start()
+
+    loop.run_until_complete(serve())
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return f"http://127.0.0.1:{sock.getsockname()[1]}", served
+
+def run(hedged, requests, concurrency):
+    """Issue `requests` hedged calls and return sorted latencies and the error count."""
+    async def main():
+        limit = asyncio.Semaphore(concurrency)
+        latencies, errors = [], 0
+
+        async def one():
+            nonlocal errors
+            async with limit:
+                started = time.perf_counter()
+                try:
+                    await hedged.arequest("POST", "/v1/completions", json={"prompt": "hi"})
+                    latencies.append(time.perf_counter() - started)
+                except Exception:
+                    errors += 1
+
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return sorted(latencies), errors
+    return asyncio.run(main())
+
+def report(name, latencies, errors):
+    pct = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    print(f"{name:<12} p50 {pct(0.50):6.1f} ms  p99 {pct(0.99):6.1f} ms  max {latencies[-1] * 1000:6.1f} ms  errors {errors}")
+
+def check_breaker_recovery(client):
+    """
+    Regression: with max_hedges=0 a node whose breaker opened must be probed
+    and taken back once it recovers, even though every request only
+    launches a single attempt.
+    """
+    flaky, flaky_served = start_fake_server(0.005, error_rate=1.0, seed=4)
+    good, _ = start_fake_server(0.005, seed=5)
+    hedged = HedgedClient(client, [flaky, good], hedge_delay=0.05, max_hedges=0,
+                          failure_threshold=5, reset_timeout=0.2)
+    while hedged.health()[flaky]["state"] != "open":
+        try:
+            hedged.request("POST", "/v1/completions", json={"prompt": "hi"})
+        except Exception:
+            pass
+    flaky_served["error_rate"] = 0.0
+    time.sleep(0.25)
+    before = flaky_served["count"]
+    run(hedged, 200, 1)
+    health = hedged.health()[flaky]
+    recovered = flaky_served["count"] - before
+    print(f"{'recovery':<12} flaky node {health}, served {recovered} of 200 requests after recovering")
+    assert health["state"] == "closed", health
+    assert recovered >= 50, recovered
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=10)
+    args = parser.parse_args()
+
+    fast, _ = start_fake_server(0.02, seed=1)
+    slow_tail, _ = start_fake_server(0.02, slow_fraction=0.1, slow_latency=0.5, seed=2)
+    broken, broken_served = start_fake_server(0.02, error_rate=1.0, seed=3)
+
+    with HTTPClient() as client:
+        for name, max_hedges in (("no hedging", 0), ("hedged", 1)):
+            hedged = HedgedClient(client, [fast, slow_tail], hedge_delay=0.05, max_hedges=max_hedges)
+            report(name, *run(hedged, args.requests, args.concurrency))
+            print(f"{'':<12} {hedged.stats}")
+
+        hedged = HedgedClient(client, [fast, slow_tail, broken], hedge_delay=0.05, failure_threshold=3)
+        report("with broken", *run(hedged, args.requests, args.concurrency))
+        print(f"{'':<12} broken node served {broken_served['count']} of {args.requests} requests")
+        for endpoint, health in hedged.health().items():
+            print(f"{'':<12} {endpoint} {health}")
+
+        check_breaker_recovery(client)
+
+if __name__ == "__main__":
+    main()
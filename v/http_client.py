@@ -0,0 +1,414 @@
+import atexit
+import asyncio
+import threading
+import contextlib
+from collections import defaultdict
+import aiohttp
+from yarl import URL
+
+from cache import cache_key
+from ratelimit import usage_tokens
+from retry import RetryPolicy
+from sse import iter_json_events
+from streaming import ResponseStream, iter_response
+
+def flight_key(method, url, ssl_verify=True, raise_on_status=True, **kwargs):
+    """SingleFlight key: the cache key plus the options that change what a caller gets back."""
+    return f"{cache_key(method, url, **kwargs)}:{raise_on_status}:{ssl_verify!r}"
+
+class HTTPClient:
+    """
+    Long-lived HTTP client that owns one background event loop and one
+    shared aiohttp connection pool, so connections are reused across calls.
+    """
+
+    def __init__(self, limit=100, limit_per_host=20, keepalive_timeout=30.0,
+                 ttl_dns_cache=300, timeout=None, retry_policy=None, cache=None, singleflight=None,
+                 rate_limiter=None, tracer=None):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.ttl_dns_cache = ttl_dns_cache
+        self.timeout = timeout
+        self.retry_policy = retry_policy or RetryPolicy()
+        # Opt-in ResponseCache for deterministic calls; None disables caching
+        self.cache = cache
+        # Opt-in SingleFlight that shares one upstream call between identical concurrent requests
+        self.singleflight = singleflight
+        # Opt-in RateLimiter holding per-endpoint RPM/TPM buckets
+        self.rate_limiter = rate_limiter
+        # Opt-in Tracer recording a per-attempt latency breakdown through aiohttp trace hooks
+        self.tracer = tracer
+        self._closed = False
+
+        # The loop runs forever in a daemon thread; sync callers submit work to it
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="http-client-loop", daemon=True)
+        self._thread.start()
+        self._session = self.run(self._create_session())
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    async def _create_session(self):
+        """Create the shared session and TCP connector on the background loop."""
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            use_dns_cache=True,
+            ttl_dns_cache=self.ttl_dns_cache,
+        )
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        trace_configs = [self.tracer.trace_config()] if self.tracer is not None else None
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=trace_configs)
+
+    def run(self, coro):
+        """Run a coroutine on the client's loop and block until it finishes."""
+        if self._closed:
+            raise RuntimeError("HTTPClient is closed.")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    async def _on_loop(self, coro):
+        """Await a coroutine on the client's loop from whichever loop the caller runs on."""
+        if self._closed:
+            raise RuntimeError("HTTPClient is closed.")
+        if asyncio.get_running_loop() is self._loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+    def _policy(self, max_retries):
+        if max_retries is None:
+            return self.retry_policy
+        return self.retry_policy.with_max_retries(max_retries)
+
+    async def _request(self, method, url, max_retries=None, request_timeout=None, use_cache=True, coalesce=True,
+                       rate_limit_key=None, **kwargs):
+        """
+        Issue a request on the shared session, retrying per the client's
+        RetryPolicy. `request_timeout` bounds the whole call including retries.
+        Only 2xx results are cached, so error bodies returned with
+        raise_on_status=False are never replayed.
+        """
+        cache = self.cache if use_cache else None
+        if cache is not None:
+            key = cache.key(method, url, **kwargs)
+            cached = await cache.aget(key)
+            if cached is not None:
+                return cached
+
+        # Status of the attempt that produced the result; stays None when a coalesced call shared another's
+        status = [None]
+        attempt = lambda: self._send(method, url, status=status, **kwargs)
+        if self.rate_limiter is not None:
+            unlimited = attempt
+            attempt = lambda: self._rate_limited(unlimited, url, kwargs.get("json"), rate_limit_key)
+        send = lambda: self._policy(max_retries).call(attempt)
+        if self.singleflight is not None and coalesce:
+            coro = self.singleflight.do(flight_key(method, url, **kwargs), send)
+        else:
+            coro = send()
+        if request_timeout is None:
+            result = await coro
+        else:
+            result = await asyncio.wait_for(coro, request_timeout)
+
+        if cache is not None and status[0] is not None and 200 <= status[0] < 300:
+            await cache.aset(key, result)
+        return result
+
+    async def _rate_limited(self, attempt, url, payload, key):
+        """Wait for RPM/TPM capacity, run one attempt and correct the estimate from reported usage."""
+        reservation = await self.rate_limiter.acquire(url, payload, key=key)
+        try:
+            result = await attempt()
+        except aiohttp.ClientResponseError as exc:
+            if exc.status == 429:
+                self.rate_limiter.throttled(reservation)
+            raise
+        self.rate_limiter.settle(reservation, usage_tokens(result))
+        return result
+
+    async def _rate_limited_open(self, open_attempt, url, payload, key, reservation):
+        """Stream counterpart of `_rate_limited`: acquire capacity for each attempt to open the response."""
+        reservation[0] = await self.rate_limiter.acquire(url, payload, key=key)
+        try:
+            return await open_attempt()
+        except aiohttp.ClientResponseError as exc:
+            if exc.status == 429:
+                self.rate_limiter.throttled(reservation[0])
+            raise
+
+    def _settled_stream(self, produce, reservation):
+        """Correct the successful attempt's token estimate from the usage reported in the chunks."""
+        async def settled():
+            actual = None
+            async for item in produce():
+                actual = usage_tokens(item) or actual
+                yield item
+            self.rate_limiter.settle(reservation[0], actual)
+        return settled
+
+    async def _send(self, method, url, ssl_verify=True, raise_on_status=True, proxy=None, status=None, **kwargs):
+        """Issue a single attempt on the shared session and read the whole body; `status` receives its status."""
+        timing = self.tracer.start(method, url) if self.tracer is not None else None
+        try:
+            async with self._session.request(
+                method=method,
+                url=url,
+                ssl=bool(ssl_verify),
+                proxy=proxy,
+                raise_for_status=raise_on_status,
+                trace_request_ctx=timing,
+                **kwargs
+            ) as response:
+                # Check for JSON response
+                if response.content_type == 'application/json':
+                    result = await response.json()
+                else:
+                    # Otherwise the body is an SSE/NDJSON sequence of chunks; read them all
+                    result = [item async for item in iter_json_events(response)]
+                if status is not None:
+                    status[0] = response.status
+        except Exception as exc:
+            if timing is not None:
+                self.tracer.finish(timing, status=getattr(exc, "status", None), error=exc)
+            raise
+        if timing is not None:
+            self.tracer.finish(timing, status=response.status)
+        return result
+
+    async def _open(self, method, url, ssl_verify=True, raise_on_status=True, proxy=None, timing=None, **kwargs):
+        """Start a single attempt and return the response with its body still unread."""
+        try:
+            response = await self._session.request(
+                method=method,
+                url=url,
+                ssl=bool(ssl_verify),
+                proxy=proxy,
+                raise_for_status=raise_on_status,
+                trace_request_ctx=timing,
+                **kwargs
+            )
+        except Exception as exc:
+            if timing is not None:
+                self.tracer.finish(timing, status=getattr(exc, "status", None), error=exc)
+            raise
+        if timing is not None:
+            timing.status = response.status
+        return response
+
+    async def _traced_stream(self, items, attempt_timing):
+        """Mark first/last token on the successful attempt's timing and finish it when the stream ends."""
+        error = None
+        try:
+            async for item in items:
+                attempt_timing[0].mark_token()
+                yield item
+        except Exception as exc:
+            error = exc
+            raise
+        finally:
+            timing = attempt_timing[0]
+            if timing is not None and timing.end is None:
+                self.tracer.finish(timing, status=timing.status, error=error)
+
+    def stream(self, method, url, max_retries=None, max_buffered=64, request_timeout=None, use_cache=True,
+               coalesce=True, rate_limit_key=None, **kwargs):
+        """
+        Start a streaming request and return a ResponseStream that yields
+        chunks as they arrive. At most `max_buffered` chunks are held in memory.
+        `request_timeout` bounds the time until the response headers arrive.
+        With a cache configured, the lookup runs on the client's loop when the
+        stream starts; a hit is replayed from the cache and a 2xx miss is
+        recorded once the stream has been read to the end. With
+        single-flight enabled, identical concurrent streams share one upstream
+        response and every consumer receives all of its chunks.
+        """
+        parse = iter_json_events
+        cache = self.cache if use_cache else None
+        if cache is not None:
+            key = cache.key(method, url, stream=True, **kwargs)
+            parse = self._recording_parser(cache, key)
+
+        policy = self._policy(max_retries)
+        attempt_timing = [None]
+
+        def open_attempt():
+            if self.tracer is not None:
+                attempt_timing[0] = self.tracer.start(method, url)
+            return self._open(method, url, timing=attempt_timing[0], **kwargs)
+
+        if self.rate_limiter is not None:
+            # Like non-streaming calls, every attempt (retries included) waits for its own capacity
+            reservation = [None]
+            unlimited_attempt = open_attempt
+            open_attempt = lambda: self._rate_limited_open(unlimited_attempt, url, kwargs.get("json"),
+                                                           rate_limit_key, reservation)
+
+        open_response = lambda: asyncio.wait_for(policy.call(open_attempt), request_timeout)
+        produce = lambda: iter_response(open_response, parse)
+        if self.tracer is not None:
+            untraced = produce
+            produce = lambda: self._traced_stream(untraced(), attempt_timing)
+        if self.rate_limiter is not None:
+            produce = self._settled_stream(produce, reservation)
+        if self.singleflight is not None and coalesce:
+            stream_key = flight_key(method, url, **kwargs) + ":stream"
+            upstream = produce
+            produce = lambda: self.singleflight.subscribe(stream_key, upstream)
+        if cache is not None:
+            produce = self._cached_stream(produce, cache, key)
+        return ResponseStream(self._loop, produce, max_buffered=max_buffered)
+
+    @staticmethod
+    def _cached_stream(produce, cache, key):
+        """Replay a cached stream, looked up on the client's loop (off the caller's), or run the live one."""
+        async def cached():
+            chunks = await cache.aget(key)
+            if chunks is not None:
+                for item in chunks:
+                    yield item
+                return
+            async for item in produce():
+                yield item
+        return cached
+
+    @staticmethod
+    def _recording_parser(cache, key):
+        """Parse a stream while keeping its chunks; store them only if it completes with a 2xx status."""
+        async def parse(response):
+            chunks = []
+            async for item in iter_json_events(response):
+                chunks.append(item)
+                yield item
+            if 200 <= response.status < 300:
+                await cache.aset(key, chunks)
+        return parse
+
+    def request(self, method, url, max_retries=None, ssl_verify=True, raise_on_status=True, proxy=None,
+                stream=False, **kwargs):
+        """
+        Perform an HTTP request on the pooled session. Returns the decoded
+        body, or a ResponseStream when `stream` is True.
+        """
+        if stream:
+            return self.stream(method, url, max_retries=max_retries, ssl_verify=ssl_verify,
+                               raise_on_status=raise_on_status, proxy=proxy, **kwargs)
+        return self.run(self._request(method, url, max_retries=max_retries, ssl_verify=ssl_verify,
+                                      raise_on_status=raise_on_status, proxy=proxy, **kwargs))
+
+    async def arequest(self, method, url, max_retries=None, ssl_verify=True, raise_on_status=True, proxy=None,
+                       stream=False, **kwargs):
+        """Async counterpart of `request`, safe to await from any event loop."""
+        if stream:
+            return self.stream(method, url, max_retries=max_retries, ssl_verify=ssl_verify,
+                               raise_on_status=raise_on_status, proxy=proxy, **kwargs)
+        return await self._on_loop(self._request(method, url, max_retries=max_retries, ssl_verify=ssl_verify,
+                                                 raise_on_status=raise_on_status, proxy=proxy, **kwargs))
+
+    async def _gather(self, specs, concurrency, per_host, return_exceptions):
+        limit = asyncio.Semaphore(concurrency)
+        host_limits = defaultdict(lambda: asyncio.Semaphore(per_host))
+
+        async def one(spec):
+            spec = dict(spec)
+            method = spec.pop("method", "GET")
+            url = spec.pop("url")
+            host_limit = host_limits[URL(url).host] if per_host else contextlib.nullcontext()
+            async with limit, host_limit:
+                return await self._request(method, url, **spec)
+
+        return await asyncio.gather(*(one(spec) for spec in specs), return_exceptions=return_exceptions)
+
+    async def agather(self, specs, concurrency=10, per_host=None, return_exceptions=True):
+        """
+        Run many requests with at most `concurrency` in flight overall and
+        `per_host` per host. Each spec is a dict with `method`, `url` and any
+        `request` keyword (`json`, `headers`, `max_retries`, `request_timeout`...).
+        Results come back in input order; with `return_exceptions` a failed
+        request yields its exception instead of failing the whole batch.
+        """
+        return await self._on_loop(self._gather(specs, concurrency, per_host, return_exceptions))
+
+    def gather(self, specs, concurrency=10, per_host=None, return_exceptions=True):
+        """Blocking counterpart of `agather`."""
+        return self.run(self._gather(specs, concurrency, per_host, return_exceptions))
+
+    @property
+    def retry_stats(self) -> dict:
+        """Attempt, retry and backoff counters of the client's retry policy."""
+        return self.retry_policy.stats.snapshot()
+
+    @property
+    def singleflight_stats(self) -> dict:
+        """Calls, upstream requests and coalescing ratio, empty when single-flight is off."""
+        return self.singleflight.stats.snapshot() if self.singleflight is not None else {}
+
+    @property
+    def rate_limit_stats(self) -> dict:
+        """Acquire/wait counters and estimated vs actual tokens, empty when rate limiting is off."""
+        return self.rate_limiter.stats.snapshot() if self.rate_limiter is not None else {}
+
+    @property
+    def latency_stats(self) -> dict:
+        """Per-phase latency histograms from the tracer, empty when tracing is off."""
+        return self.tracer.dump() if self.tracer is not None else {}
+
+    @property
+    def cache_stats(self) -> dict:
+        """Hit/miss counters of the response cache, empty when caching is off."""
+        return self.cache.stats.snapshot() if self.cache is not None else {}
+
+    async def _shutdown(self):
+        # Cancel streams that were never drained so their connections are released first
+        tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+    def close(self):
+        """Close the session, stop the background loop and join its thread."""
+        if self._closed:
+            return
+        self.run(self._shutdown())
+        self._closed = True
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+def get_default_client() -> HTTPClient:
+    """Return the process-wide HTTPClient, creating it on first use."""
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = HTTPClient()
+                atexit.register(_default_client.close)
+    return _default_client
+
+def set_default_client(client: HTTPClient):
+    """
+    Replace the process-wide client, e.g. with one that has a ResponseCache,
+    and close the previous one.
+    """
+    global _default_client
+    with _default_client_lock:
+        previous, _default_client = _default_client, client
+    atexit.register(client.close)
+    if previous is not None and previous is not client:
+        previous.close()
@@ -0,0 +1,177 @@
+"""
+Load generator for HTTPClient. Runs closed-loop (fixed number of workers,
+each sending back to back) or open-loop (Poisson arrivals at a fixed rate)
+traffic and reports throughput, p50/p95/p99 latency, time to first token
+and memory. Every run is appended as one JSON line to --output so results
+can be compared across commits.
+
+Against a mock server started in-process:
+    python loadtest.py --mode closed --concurrency 50 --duration 20
+    python loadtest.py --mode open --rate 200 --duration 20 --stream
+Against a separately started mock_server.py or a real endpoint:
+    python loadtest.py --url http://127.0.0.1:8080/v1/completions
+"""
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import subprocess
+from collections import Counter
+import aiohttp
+
+from http_client import HTTPClient
+from mock_server import MockLLMServer
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100.0))]
+
+def max_rss_mb():
+    """Peak resident set size of this process (Linux reports KiB)."""
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = []
+        self.ttfts = []
+        self.errors = Counter()
+
+    def ok(self, latency, ttft=None):
+        self.latencies.append(latency)
+        if ttft is not None:
+            self.ttfts.append(ttft)
+
+    def error(self, exc):
+        if isinstance(exc, aiohttp.ClientResponseError):
+            self.errors[f"HTTP {exc.status}"] += 1
+        else:
+            self.errors[type(exc).__name__] += 1
+
+    def summary(self, elapsed) -> dict:
+        ms = lambda v: None if v is None else round(v * 1000.0, 3)
+        return {
+            "completed": len(self.latencies),
+            "errors": dict(self.errors),
+            "elapsed_s": round(elapsed, 3),
+            "throughput_rps": round(len(self.latencies) / elapsed, 2) if elapsed else None,
+            "latency_ms": {f"p{p}": ms(percentile(self.latencies, p)) for p in (50, 95, 99)},
+            "ttft_ms": {f"p{p}": ms(percentile(self.ttfts, p)) for p in (50, 95, 99)} if self.ttfts else None,
+        }
+
+
+async def one_request(client, url, payload, stream, max_retries, recorder, scheduled):
+    """Send one request; latency is measured from `scheduled` so queueing delay is not hidden."""
+    ttft = None
+    try:
+        if stream:
+            chunks = client.stream("POST", url, json=payload, max_retries=max_retries)
+            async for _ in chunks:
+                if ttft is None:
+                    ttft = time.perf_counter() - scheduled
+        else:
+            await client.arequest("POST", url, json=payload, max_retries=max_retries)
+    except Exception as exc:
+        recorder.error(exc)
+        return
+    recorder.ok(time.perf_counter() - scheduled, ttft)
+
+async def closed_loop(client, url, payload, args, recorder):
+    deadline = time.perf_counter() + args.duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            await one_request(client, url, payload, args.stream, args.max_retries, recorder, time.perf_counter())
+
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+
+async def open_loop(client, url, payload, args, recorder):
+    rng = random.Random(args.seed)
+    start = time.perf_counter()
+    deadline = start + args.duration
+    scheduled = start
+    tasks = set()
+    while True:
+        scheduled += rng.expovariate(args.rate)
+        if scheduled > deadline:
+            break
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        task = asyncio.ensure_future(one_request(client, url, payload, args.stream, args.max_retries,
+                                                 recorder, scheduled))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    await asyncio.gather(*tasks)
+
+def run(args) -> dict:
+    server = None
+    url = args.url
+    if url is None:
+        server = MockLLMServer(args.server_latency, args.tokens_per_second, args.max_tokens,
+                               args.error_rate, args.throttle_rate, seed=args.seed)
+        url = server.start_in_thread() + "/v1/completions"
+
+    payload = {"model": "mock", "prompt": "Summarise the quarterly report.", "max_tokens": args.max_tokens,
+               "stream": args.stream}
+    recorder = Recorder()
+    rss_before = max_rss_mb()
+    with HTTPClient(limit=args.pool_size, limit_per_host=args.pool_size) as client:
+        generator = closed_loop if args.mode == "closed" else open_loop
+        started = time.perf_counter()
+        asyncio.run(generator(client, url, payload, args, recorder))
+        elapsed = time.perf_counter() - started
+    if server is not None:
+        server.stop_thread()
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k != "output"},
+        **recorder.summary(elapsed),
+        "memory": {"max_rss_mb_before": rss_before, "max_rss_mb_after": max_rss_mb()},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="target endpoint; defaults to an in-process mock server")
+    parser.add_argument("--mode", choices=("closed", "open"), default="closed")
+    parser.add_argument("--concurrency", type=int, default=20, help="closed-loop workers")
+    parser.add_argument("--rate", type=float, default=100.0, help="open-loop arrivals per second")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--stream", action="store_true")
+    parser.add_argument("--max-tokens", type=int, default=16)
+    parser.add_argument("--max-retries", type=int, default=0)
+    parser.add_argument("--pool-size", type=int, default=100)
+    parser.add_argument("--server-latency", default="lognormal:0.05:0.5")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="loadtest_results.jsonl")
+    args = parser.parse_args()
+
+    result = run(args)
+    print(json.dumps(result, indent=2))
+    with open(args.output, "a") as f:
+        f.write(json.dumps(result) + "\n")
+
+if __name__ == "__main__":
+    main()
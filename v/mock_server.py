@@ -0,0 +1,170 @@
+"""
+Local stand-in for an OpenAI-style model server, for load tests and
+benchmarks of the HTTP client.
+
+    python mock_server.py --port 8080 --latency lognormal:0.2:0.5 --tokens-per-second 50 \\
+        --error-rate 0.01 --throttle-rate 0.02
+
+Serves POST /v1/completions and /v1/chat/completions. A body with
+"stream": true is answered as text/event-stream, one token per event.
+"""
+import json
+import math
+import time
+import random
+import socket
+import asyncio
+import argparse
+import threading
+from aiohttp import web
+
+class LatencyDistribution:
+    """
+    Server think time before the first byte, parsed from "kind:args":
+    constant:0.1, uniform:0.05:0.3, exponential:0.2 (mean),
+    lognormal:0.2:0.5 (median, sigma).
+    """
+
+    def __init__(self, spec="constant:0.05", seed=None):
+        self.spec = spec
+        kind, *args = spec.split(":")
+        self.kind = kind
+        self.args = [float(a) for a in args]
+        self._rng = random.Random(seed)
+
+    def sample(self) -> float:
+        if self.kind == "constant":
+            return self.args[0]
+        if self.kind == "uniform":
+            return self._rng.uniform(*self.args)
+        if self.kind == "exponential":
+            return self._rng.expovariate(1.0 / self.args[0])
+        if self.kind == "lognormal":
+            median, sigma = self.args
+            return self._rng.lognormvariate(math.log(median), sigma)
+        raise ValueError(f"Unknown latency distribution '{self.spec}'.")
+
+
+class MockLLMServer:
+    """aiohttp.web app with configurable latency, token rate, errors and 429s."""
+
+    def __init__(self, latency="constant:0.05", tokens_per_second=100.0, completion_tokens=32,
+                 error_rate=0.0, throttle_rate=0.0, retry_after=1.0, seed=None):
+        self.latency = LatencyDistribution(latency, seed)
+        self.tokens_per_second = tokens_per_second
+        self.completion_tokens = completion_tokens
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.stats = {"requests": 0, "errors": 0, "throttled": 0, "streams": 0}
+        self._rng = random.Random(seed)
+        self._runner = None
+        self._loop = None
+        self.url = None
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/v1/completions", self.handle)
+        app.router.add_post("/v1/chat/completions", self.handle)
+        return app
+
+    async def handle(self, request):
+        self.stats["requests"] += 1
+        body = await request.json() if request.can_read_body else {}
+        roll = self._rng.random()
+        if roll < self.throttle_rate:
+            self.stats["throttled"] += 1
+            return web.json_response({"error": {"type": "rate_limit_exceeded"}}, status=429,
+                                     headers={"Retry-After": str(self.retry_after)})
+        if roll < self.throttle_rate + self.error_rate:
+            self.stats["errors"] += 1
+            return web.json_response({"error": {"type": "server_error"}}, status=503)
+
+        await asyncio.sleep(self.latency.sample())
+        tokens = int(body.get("max_tokens") or self.completion_tokens)
+        prompt_tokens = len(json.dumps(body.get("messages") or body.get("prompt") or "")) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": tokens, "total_tokens": prompt_tokens + tokens}
+        if body.get("stream"):
+            return await self._stream(request, tokens, usage)
+        if self.tokens_per_second:
+            await asyncio.sleep(tokens / self.tokens_per_second)
+        return web.json_response({
+            "id": "cmpl-mock",
+            "object": "text_completion",
+            "created": int(time.time()),
+            "choices": [{"index": 0, "text": " tok" * tokens, "finish_reason": "length"}],
+            "usage": usage,
+        })
+
+    async def _stream(self, request, tokens, usage):
+        self.stats["streams"] += 1
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        interval = 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+        for i in range(tokens):
+            chunk = {"id": "cmpl-mock", "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": {"content": " tok"}, "finish_reason": None}]}
+            if i == tokens - 1:
+                chunk["usage"] = usage
+            await response.write(b"data: " + json.dumps(chunk).encode() + b"\n\n")
+            if interval:
+                await asyncio.sleep(interval)
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+    async def start(self, host="127.0.0.1", port=0) -> str:
+        """Start serving on the running loop and return the base URL."""
+        sock = socket.socket()
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((host, port))
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        await web.SockSite(self._runner, sock, backlog=1024).start()
+        self.url = f"http://{host}:{sock.getsockname()[1]}"
+        return self.url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def start_in_thread(self, host="127.0.0.1", port=0) -> str:
+        """Serve from a daemon thread with its own loop; returns the base URL."""
+        self._loop = asyncio.new_event_loop()
+        url = self._loop.run_until_complete(self.start(host, port))
+        threading.Thread(target=self._loop.run_forever, name="mock-llm-server", daemon=True).start()
+        return url
+
+    def stop_thread(self):
+        if self._loop is not None:
+            asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", default="constant:0.05")
+    parser.add_argument("--tokens-per-second", type=float, default=100.0)
+    parser.add_argument("--completion-tokens", type=int, default=32)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    server = MockLLMServer(args.latency, args.tokens_per_second, args.completion_tokens,
+                           args.error_rate, args.throttle_rate, args.retry_after, args.seed)
+
+    async def serve():
+        print(f"Mock LLM server on {await server.start(args.host, args.port)}")
+        await asyncio.Event().wait()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
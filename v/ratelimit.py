@@ -0,0 +1,164 @@
+import time
+import asyncio
+
+from counters import Counters
+
+def estimate_tokens(payload) -> int:
+    """
+    Rough token estimate for an OpenAI-style request body: ~4 characters per
+    prompt token plus the requested completion budget.
+    """
+    if not isinstance(payload, dict):
+        return 1
+    chars = len(str(payload.get("prompt") or ""))
+    for message in payload.get("messages") or ():
+        content = message.get("content") if isinstance(message, dict) else message
+        chars += len(str(content or ""))
+    completion = payload.get("max_tokens") or payload.get("max_completion_tokens") or 256
+    return max(1, chars // 4 + completion)
+
+def usage_tokens(body):
+    """Total tokens reported in a response's `usage` block, if present."""
+    if isinstance(body, dict):
+        usage = body.get("usage")
+        if isinstance(usage, dict):
+            return usage.get("total_tokens")
+    return None
+
+
+class TokenBucket:
+    """
+    Bucket refilled continuously at `per_minute / 60` units per second.
+    Waiters are served FIFO, and the level may go negative when a call turns
+    out to be more expensive than estimated. Not thread-safe; use it from the
+    HTTPClient's event loop.
+    """
+
+    def __init__(self, per_minute, burst=None):
+        self.rate = per_minute / 60.0
+        self.capacity = burst or per_minute
+        self.tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, amount=1) -> float:
+        """Wait until `amount` units are available, take them, and return the time waited."""
+        # A single request larger than the bucket would otherwise wait forever
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+
+    def adjust(self, delta):
+        """Take `delta` more units (or give them back when negative)."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+    def drain(self):
+        """Empty the bucket, e.g. after the provider answered 429."""
+        self._refill()
+        self.tokens = min(self.tokens, 0.0)
+
+
+class EndpointLimit:
+    """Requests-per-minute and tokens-per-minute quota of one endpoint."""
+
+    def __init__(self, rpm=None, tpm=None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+
+
+class Reservation:
+    """Capacity taken for one call, settled once its real usage is known."""
+
+    __slots__ = ("limit", "estimated")
+
+    def __init__(self, limit, estimated):
+        self.limit = limit
+        self.estimated = estimated
+
+
+class RateLimiterStats(Counters):
+    FIELDS = {"acquired": 0, "waited": 0, "wait_seconds": 0.0, "estimated_tokens": 0, "actual_tokens": 0,
+              "throttled": 0}
+
+
+class RateLimiter:
+    """
+    Per-endpoint RPM/TPM limiter. Endpoints are URL prefixes, matched
+    longest first; for an Azure-style deployment use
+    `endpoint_key(config)` on the model's config record. Token costs are
+    estimated up front and corrected from the `usage` the response reports.
+    """
+
+    def __init__(self, limits=None, estimator=estimate_tokens):
+        self.estimator = estimator
+        self.stats = RateLimiterStats()
+        self._limits = {}
+        self._prefixes = []
+        for endpoint, limit in (limits or {}).items():
+            self.set_limit(endpoint, limit.rpm, limit.tpm)
+
+    def set_limit(self, endpoint, rpm=None, tpm=None):
+        self._limits[endpoint.rstrip("/")] = EndpointLimit(rpm, tpm)
+        self._prefixes = sorted(self._limits, key=len, reverse=True)
+
+    def limit_for(self, url, key=None):
+        if key is not None:
+            return self._limits.get(key.rstrip("/"))
+        url = str(url)
+        for prefix in self._prefixes:
+            if url.startswith(prefix):
+                return self._limits[prefix]
+        return None
+
+    async def acquire(self, url, payload=None, key=None):
+        """Await capacity for one call; returns a Reservation, or None when the endpoint is unlimited."""
+        limit = self.limit_for(url, key)
+        if limit is None:
+            return None
+        estimated = self.estimator(payload) if limit.tokens is not None else 0
+        waited = 0.0
+        if limit.requests is not None:
+            waited += await limit.requests.acquire(1)
+        if limit.tokens is not None:
+            waited += await limit.tokens.acquire(estimated)
+        self.stats.add(acquired=1, waited=1 if waited else 0, wait_seconds=waited, estimated_tokens=estimated)
+        return Reservation(limit, estimated)
+
+    def settle(self, reservation, actual):
+        """Correct the token bucket with the usage reported by the provider."""
+        if reservation is None or actual is None:
+            return
+        self.stats.add(actual_tokens=actual)
+        if reservation.limit.tokens is not None:
+            reservation.limit.tokens.adjust(actual - reservation.estimated)
+
+    def throttled(self, reservation):
+        """The provider rejected the call with 429: stop sending until the buckets refill."""
+        if reservation is None:
+            return
+        self.stats.add(throttled=1)
+        if reservation.limit.requests is not None:
+            reservation.limit.requests.drain()
+
+
+def endpoint_key(config) -> str:
+    """Rate-limit key for a model config record (`openai_api_base` + deployment)."""
+    base = config["openai_api_base"].rstrip("/")
+    deployment = config.get("openai_deployment_name")
+    return f"{base}/openai/deployments/{deployment}" if deployment else base
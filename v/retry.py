@@ -0,0 +1,139 @@
+import copy
+import time
+import random
+import asyncio
+import threading
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+import aiohttp
+
+from counters import Counters
+
+# Statuses that mean "the server did not process this, try again later"
+RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+class RetryBudget:
+    """
+    Process-wide retry budget. Every request deposits `ratio` tokens and every
+    retry withdraws one, with a small per-second floor so low traffic can still
+    retry. During an outage the budget drains and retries stop amplifying load.
+    """
+
+    def __init__(self, ratio=0.2, min_per_second=5.0, max_tokens=100.0):
+        self.ratio = ratio
+        self.min_per_second = min_per_second
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.max_tokens, self._tokens + (now - self._last_refill) * self.min_per_second)
+        self._last_refill = now
+
+    def record_request(self):
+        """Deposit credit for a first attempt."""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        """Take one retry token; return False when the budget is exhausted."""
+        with self._lock:
+            self._refill()
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+
+class RetryStats(Counters):
+    """Thread-safe counters for retry activity."""
+
+    FIELDS = {"attempts": 0, "retries": 0, "backoff_seconds": 0.0, "budget_exhausted": 0, "gave_up": 0}
+
+
+DEFAULT_RETRY_BUDGET = RetryBudget()
+
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter, Retry-After support, a cap on total
+    retry time and a shared RetryBudget.
+    """
+
+    def __init__(self, max_retries=3, backoff_base=0.5, backoff_max=30.0, max_total_time=120.0,
+                 retry_statuses=RETRYABLE_STATUSES, respect_retry_after=True, budget=None, stats=None):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_total_time = max_total_time
+        self.retry_statuses = frozenset(retry_statuses)
+        self.respect_retry_after = respect_retry_after
+        self.budget = budget if budget is not None else DEFAULT_RETRY_BUDGET
+        self.stats = stats if stats is not None else RetryStats()
+
+    def with_max_retries(self, max_retries):
+        """Return a copy with a different retry count that shares budget and stats."""
+        policy = copy.copy(self)
+        policy.max_retries = max_retries
+        return policy
+
+    def compute_backoff(self, retry_number: int) -> float:
+        """Full jitter: uniform in [0, min(backoff_max, base * 2**n)]."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** retry_number)))
+
+    def is_retryable(self, exc: BaseException) -> bool:
+        """
+        Decide whether an error is safe to retry. Streaming calls only retry
+        opening the response, before any chunk reaches the consumer, so a
+        retry cannot duplicate output.
+        """
+        if isinstance(exc, aiohttp.ClientResponseError):
+            return exc.status in self.retry_statuses
+        return isinstance(exc, (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError))
+
+    @staticmethod
+    def retry_after(exc: BaseException):
+        """Parse Retry-After (seconds or HTTP-date) from a response error, if any."""
+        headers = getattr(exc, "headers", None)
+        value = headers.get("Retry-After") if headers else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            # HTTP-dates are GMT; a date without a zone would otherwise be read as local time
+            when = when.replace(tzinfo=timezone.utc)
+        return max(0.0, when.timestamp() - time.time())
+
+    async def call(self, send):
+        """Await `send()` until it succeeds or the policy gives up."""
+        deadline = time.monotonic() + self.max_total_time
+        self.budget.record_request()
+        retry_number = 0
+        while True:
+            self.stats.add(attempts=1)
+            try:
+                return await send()
+            except Exception as exc:
+                if retry_number >= self.max_retries or not self.is_retryable(exc):
+                    raise
+                delay = self.retry_after(exc) if self.respect_retry_after else None
+                if delay is None:
+                    delay = self.compute_backoff(retry_number)
+                if time.monotonic() + delay > deadline:
+                    self.stats.add(gave_up=1)
+                    raise
+                if not self.budget.try_withdraw():
+                    self.stats.add(budget_exhausted=1)
+                    raise
+                self.stats.add(retries=1, backoff_seconds=delay)
+                await asyncio.sleep(delay)
+                retry_number += 1
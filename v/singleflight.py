@@ -0,0 +1,149 @@
+import asyncio
+
+from counters import Counters
+
+class SingleFlightStats(Counters):
+    """Counters for coalesced calls; `coalescing_ratio` is the share served by another caller's request."""
+
+    FIELDS = {"calls": 0, "upstream": 0, "coalesced": 0}
+
+    def _snapshot(self) -> dict:
+        snapshot = super()._snapshot()
+        snapshot["coalescing_ratio"] = self.coalesced / self.calls if self.calls else 0.0
+        return snapshot
+
+
+class _Broadcast:
+    """
+    Fans one upstream stream out to any number of subscribers. At most
+    `max_buffered` chunks are held: once the buffer is full, chunks every
+    subscriber has read are dropped, and upstream is paused while the slowest
+    subscriber still needs the oldest one. Until the first chunk is dropped a
+    subscriber that joins late still sees the stream from the start.
+    """
+
+    def __init__(self, produce, on_done, max_buffered=64):
+        self.chunks = []
+        self.offset = 0  # stream position of chunks[0]
+        self.max_buffered = max_buffered
+        self.done = False
+        self.error = None
+        self.cursors = {}
+        self._on_done = on_done
+        self._changed = asyncio.Event()
+        self._advanced = asyncio.Event()
+        self.task = asyncio.get_running_loop().create_task(self._run(produce))
+
+    @property
+    def joinable(self):
+        """Whether a new subscriber can still replay the stream from its first chunk."""
+        return not self.done and self.offset == 0
+
+    def _low(self):
+        return min(self.cursors.values(), default=self.offset)
+
+    async def _run(self, produce):
+        try:
+            async for item in produce():
+                while len(self.chunks) >= self.max_buffered and self._low() == self.offset:
+                    await self._advanced.wait()
+                if len(self.chunks) >= self.max_buffered:
+                    low = self._low()
+                    del self.chunks[:low - self.offset]
+                    self.offset = low
+                self.chunks.append(item)
+                self._notify()
+        except Exception as exc:
+            self.error = exc
+        finally:
+            self.done = True
+            self._on_done()
+            self._notify()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    def _advance(self):
+        self._advanced.set()
+        self._advanced = asyncio.Event()
+
+    async def subscribe(self):
+        token = object()
+        position = self.cursors[token] = self.offset
+        try:
+            while True:
+                while position < self.offset + len(self.chunks):
+                    item = self.chunks[position - self.offset]
+                    position = self.cursors[token] = position + 1
+                    self._advance()
+                    yield item
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                await self._changed.wait()
+        finally:
+            del self.cursors[token]
+            self._advance()
+            if not self.cursors and not self.done:
+                # Everyone walked away; stop reading upstream
+                self._on_done()
+                self.task.cancel()
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight calls, keyed like the response cache:
+    the first caller runs the upstream request and everyone who asks for the
+    same key while it is running shares its result. Shared streams hold at
+    most `max_buffered` chunks (see _Broadcast); a stream that has already
+    dropped chunks is not joined, a new upstream is started instead. Must be
+    used from the HTTPClient's event loop.
+    """
+
+    def __init__(self, max_buffered=64):
+        self.max_buffered = max_buffered
+        self.stats = SingleFlightStats()
+        self._calls = {}
+        self._streams = {}
+
+    async def do(self, key, send):
+        """Await `send()` once per key no matter how many callers ask concurrently."""
+        task = self._calls.get(key)
+        if task is None:
+            # The shared call runs in its own task so one caller timing out does not cancel it for the rest
+            task = asyncio.get_running_loop().create_task(send())
+            task.add_done_callback(lambda t: self._forget(key, t))
+            self._calls[key] = task
+            self.stats.add(calls=1, upstream=1)
+        else:
+            self.stats.add(calls=1, coalesced=1)
+        return await asyncio.shield(task)
+
+    def _forget(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # mark as retrieved even if every caller went away
+
+    def _forget_stream(self, key, broadcast):
+        if self._streams.get(key) is broadcast:
+            del self._streams[key]
+
+    async def subscribe(self, key, produce):
+        """Iterate the shared stream for `key`, starting it if needed."""
+        # Joined on first iteration, in the same step the subscriber starts reading, so no chunk is missed
+        broadcast = self._streams.get(key)
+        if broadcast is None or not broadcast.joinable:
+            broadcast = _Broadcast(produce, lambda: self._forget_stream(key, broadcast), self.max_buffered)
+            self._streams[key] = broadcast
+            self.stats.add(calls=1, upstream=1)
+        else:
+            self.stats.add(calls=1, coalesced=1)
+        stream = broadcast.subscribe()
+        try:
+            async for item in stream:
+                yield item
+        finally:
+            await stream.aclose()
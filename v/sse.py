@@ -0,0 +1,159 @@
+import json
+
+# Optional dependency (pip install orjson): faster JSON decoding of events,
+# with the stdlib decoder as the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+DONE = b"[DONE]"
+
+_decode_json = json.JSONDecoder().decode
+
+def _stdlib_loads(data):
+    # json.loads on bytes sniffs the encoding in Python first; SSE is always UTF-8
+    return _decode_json(data.decode("utf-8"))
+
+def get_json_loads(fast=True):
+    """Return orjson.loads when it is installed and `fast` is set, else a stdlib decoder."""
+    if fast and orjson is not None:
+        return orjson.loads
+    return _stdlib_loads
+
+
+class Event:
+    """One dispatched server-sent event. `data` stays as raw UTF-8 bytes."""
+
+    __slots__ = ("event", "data", "id")
+
+    def __init__(self, event, data, id=None):
+        self.event = event
+        self.data = data
+        self.id = id
+
+    def __repr__(self):
+        return f"Event(event={self.event!r}, data={self.data!r}, id={self.id!r})"
+
+
+class StreamParser:
+    """
+    Incremental parser for text/event-stream (SSE) and NDJSON bodies.
+
+    Works on bytes: network chunks are appended to one buffer, complete
+    lines are split off in C, and `data: ` and blank lines (almost every
+    line of an LLM stream) are handled inline without per-line calls.
+    Payloads are handed on as bytes and decoded as UTF-8 only once a whole
+    line is in, so a chunk boundary that splits a multi-byte sequence is
+    harmless. Every line is still copied once by the split and every payload
+    decoded by the stdlib JSON decoder, so without orjson this runs a little
+    behind a bare decode-per-line loop (which ignores event/id fields,
+    multi-line data and NDJSON); orjson, which parses the bytes directly, is
+    the fast path (see bench_sse.py).
+
+    SSE lines (`data:`, `event:`, `id:`, comments starting with `:`) are
+    accumulated until a blank line dispatches the event, with multiple
+    `data:` lines joined by newlines. A line starting with `{` or `[` is an
+    NDJSON record (including a bare `[DONE]`) and is dispatched on its own.
+    """
+
+    def __init__(self):
+        self._pending = []  # chunks of the unterminated last line
+        self._event = None
+        self._data = []
+        self._id = None
+
+    def feed(self, chunk) -> list:
+        """Add raw bytes and return the events completed by them."""
+        if b"\n" not in chunk:
+            self._pending.append(chunk)
+            return []
+        if self._pending:
+            self._pending.append(chunk)
+            chunk = b"".join(self._pending)
+        # One C-level split per network chunk; the unterminated tail stays buffered
+        lines = chunk.split(b"\n")
+        tail = lines.pop()
+        self._pending = [tail] if tail else []
+        events = []
+        data = self._data
+        crlf = b"\r" in chunk
+        # `data: ` lines and blank lines are nearly every line of an LLM stream; handle them inline
+        for line in lines:
+            if crlf and line.endswith(b"\r"):
+                line = line[:-1]
+            if line.startswith(b"data: "):
+                data.append(line[6:])
+            elif not line:
+                # Same as _dispatch, inlined for the per-event hot path
+                if data:
+                    events.append(Event(self._event or "message", data[0] if len(data) == 1 else b"\n".join(data),
+                                        self._id))
+                    data = self._data = []
+                self._event = None
+            else:
+                self._line(line, events)
+                data = self._data
+        return events
+
+    def flush(self) -> list:
+        """Dispatch whatever is left once the body has ended."""
+        events = []
+        if self._pending:
+            self._line(b"".join(self._pending), events)
+            self._pending = []
+        self._dispatch(events)
+        return events
+
+    def _dispatch(self, events):
+        if self._data:
+            data = self._data[0] if len(self._data) == 1 else b"\n".join(self._data)
+            events.append(Event(self._event or "message", data, self._id))
+        self._event = None
+        self._data = []
+
+    def _line(self, line, events):
+        if line.endswith(b"\r"):
+            line = line[:-1]
+        if not line:
+            self._dispatch(events)
+            return
+        first = line[0]
+        if first == 0x3A:  # ':' comment / keep-alive
+            return
+        if first == 0x7B or first == 0x5B:  # '{' or '[' -> NDJSON record
+            self._dispatch(events)
+            events.append(Event("message", line))
+            return
+        if line.startswith(b"data: "):
+            self._data.append(line[6:])
+            return
+        field, _, value = line.partition(b":")
+        if value.startswith(b" "):
+            value = value[1:]
+        if field == b"data":
+            self._data.append(value)
+        elif field == b"event":
+            self._event = value.decode("utf-8")
+        elif field == b"id":
+            self._id = value.decode("utf-8")
+        # `retry:` and unknown fields are ignored, as the SSE spec requires
+
+
+async def iter_events(response):
+    """Yield raw Events from an aiohttp response as network chunks arrive."""
+    parser = StreamParser()
+    async for chunk in response.content.iter_any():
+        for event in parser.feed(chunk):
+            yield event
+    for event in parser.flush():
+        yield event
+
+
+async def iter_json_events(response, loads=None):
+    """Yield the JSON-decoded payload of every event until `[DONE]`."""
+    loads = loads or get_json_loads()
+    async for event in iter_events(response):
+        if event.data == DONE:
+            return
+        yield loads(event.data)
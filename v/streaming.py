@@ -0,0 +1,131 @@
+import time
+import asyncio
+
+from sse import iter_json_events
+
+_END = object()
+
+class _Failure:
+    """Wraps an exception raised by the pump so it can travel through the queue."""
+
+    def __init__(self, exc):
+        self.exc = exc
+
+
+async def iter_response(open_response, parse=iter_json_events):
+    """Open a response, yield its parsed chunks and release the connection afterwards."""
+    response = await open_response()
+    try:
+        async for item in parse(response):
+            yield item
+    finally:
+        # Returns the connection to the pool if the body was fully read, closes it otherwise
+        response.release()
+
+
+class ResponseStream:
+    """
+    Incremental iterator over a streaming HTTP response.
+
+    A pump task on the client's event loop drains `produce()`, an async
+    iterator of chunks (normally a parsed HTTP response), into a bounded
+    queue. When the consumer falls behind the queue fills up, the pump stops
+    reading and TCP flow control pushes back on the server, so memory stays
+    bounded. The connection stays open until the stream is exhausted, closed,
+    or garbage collected. Usable with both `for` and `async for`.
+    """
+
+    def __init__(self, loop, produce, max_buffered=64):
+        self._loop = loop
+        self._produce = produce
+        self._queue = asyncio.Queue(maxsize=max_buffered)
+        self._task = None
+        self._finished = False
+        self.started_at = time.monotonic()
+        self.first_chunk_at = None
+        self.chunks = 0
+
+    @property
+    def time_to_first_chunk(self):
+        """Seconds from stream creation to the first chunk, or None if none arrived yet."""
+        if self.first_chunk_at is None:
+            return None
+        return self.first_chunk_at - self.started_at
+
+    async def _pump(self):
+        try:
+            async for item in self._produce():
+                await self._queue.put(item)
+            await self._queue.put(_END)
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            await self._queue.put(_Failure(exc))
+
+    async def _next_on_loop(self):
+        """Fetch the next item; must run on the client's loop."""
+        if self._task is None:
+            self._task = self._loop.create_task(self._pump())
+        return await self._queue.get()
+
+    def _unwrap(self, item, stop_exc):
+        if item is _END:
+            self._finished = True
+            raise stop_exc
+        if isinstance(item, _Failure):
+            self._finished = True
+            raise item.exc
+        if self.first_chunk_at is None:
+            self.first_chunk_at = time.monotonic()
+        self.chunks += 1
+        return item
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._finished:
+            raise StopIteration
+        item = asyncio.run_coroutine_threadsafe(self._next_on_loop(), self._loop).result()
+        return self._unwrap(item, StopIteration())
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self._finished:
+            raise StopAsyncIteration
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self._loop:
+            item = await self._next_on_loop()
+        else:
+            item = await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self._next_on_loop(), self._loop))
+        return self._unwrap(item, StopAsyncIteration())
+
+    def close(self):
+        """Stop reading and release the connection. Safe to call more than once."""
+        self._finished = True
+        if self._task is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._task.cancel)
+            self._task = None
+
+    async def aclose(self):
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __del__(self):
+        self.close()
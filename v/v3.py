@@ -1,46 +1,59 @@
-import json
-import aiohttp
-import asyncio
+from http_client import get_default_client
 
 def get_http_response_with_retries(method, url, max_retries, ssl_verify=True, raise_on_status=True, proxy=None, stream=False, **kwargs):
     """
     Performs an HTTP request using Python's aiohttp module and
     return an HTTP response object.
+
+    Requests go through the process-wide pooled HTTPClient, so TCP/TLS
+    connections are reused across calls instead of being rebuilt each time.
+    Retryable failures (429, 5xx, connection errors) are retried up to
+    `max_retries` times with jittered exponential backoff.
+
+    With `stream=True` a ResponseStream is returned; it keeps the connection
+    open and yields chunks as they arrive (use `for` or `async for`).
+    """
+    client = get_default_client()
+    return client.request(
+        method,
+        url,
+        max_retries=max_retries,
+        ssl_verify=ssl_verify,
+        raise_on_status=raise_on_status,
+        proxy=proxy,
+        stream=stream,
+        **kwargs
+    )
+
+
+async def async_get_http_response_with_retries(method, url, max_retries, ssl_verify=True, raise_on_status=True, proxy=None, stream=False, **kwargs):
+    """
+    Async version of get_http_response_with_retries that can be awaited
+    from code already running an event loop.
+    """
+    client = get_default_client()
+    return await client.arequest(
+        method,
+        url,
+        max_retries=max_retries,
+        ssl_verify=ssl_verify,
+        raise_on_status=raise_on_status,
+        proxy=proxy,
+        stream=stream,
+        **kwargs
+    )
+
+def gather_requests(specs, concurrency=10, per_host=None, return_exceptions=True):
+    """
+    Run a list of request specs concurrently and return their results in
+    input order. Each spec is a dict such as
+    {"method": "POST", "url": ..., "json": {...}, "max_retries": 3, "request_timeout": 30}.
+    Failed requests are returned as exception objects unless `return_exceptions` is False.
     """
-    async def async_request():
-        # Create a ClientSession with the specified parameters
-        async with aiohttp.ClientSession() as session:
-            # Configure SSL verification
-            ssl_context = None if ssl_verify else False
-            
-            # Set up proxy if provided
-            proxy_dict = proxy
-            
-            # Make the HTTP request
-            async with session.request(
-                method=method,
-                url=url,
-                ssl=ssl_context,
-                proxy=proxy_dict,
-                raise_for_status=raise_on_status,
-                **kwargs
-            ) as response:
-                # Check for JSON response
-                if response.headers.get('Content-Type') == 'application/json':
-                    return await response.json()
-                
-                else:
-                    # Otherwise, return a generator that streams data
-                    async def stream_generator():
-                        async for chunk in response.content.iter_lines():
-                            if chunk:
-                                decoded_chunk = chunk.decode('utf-8')
-                                if decoded_chunk == '[DONE]':
-                                    return
-                                yield json.loads(decoded_chunk)
-                    
-                    return stream_generator()
+    return get_default_client().gather(specs, concurrency=concurrency, per_host=per_host,
+                                       return_exceptions=return_exceptions)
 
-    # Run the async function synchronously
-    response = asyncio.run(async_request())
-    return response
+async def async_gather_requests(specs, concurrency=10, per_host=None, return_exceptions=True):
+    """Async version of gather_requests."""
+    return await get_default_client().agather(specs, concurrency=concurrency, per_host=per_host,
+                                              return_exceptions=return_exceptions)
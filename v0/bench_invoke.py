@@ -0,0 +1,76 @@
+"""
+Per-invoke overhead of DynamicAISDK with a fresh backend client per call
+(the old behaviour) vs clients cached per (library, client_args), and what
+the built-in timing and in-flight middleware add on top.
+
+The stand-in client does the setup a provider client does on construction
+(TLS context, connection pool, auth headers) and answers without network
+I/O, so the numbers are SDK + construction overhead only.
+
+Run from the v0/ directory:
+    python bench_invoke.py
+    python bench_invoke.py --calls 2000
+"""
+import ssl
+import time
+import argparse
+import statistics
+
+from llmclient import DynamicAISDK
+from middleware import InFlightMiddleware, TimingMiddleware
+
+class StandInLLM:
+    def __init__(self, model_name="stand-in", api_key="sk-local"):
+        self.model_name = model_name
+        self.headers = {"Authorization": f"Bearer {api_key}"}
+        # Loading the CA bundle is the bulk of what httpx/requests clients pay per construction
+        self.ssl_context = ssl.create_default_context()
+        self.pool = {}
+
+    def invoke(self, query):
+        return query
+
+    def close(self):
+        self.pool.clear()
+
+CONFIG = {
+    "default_library": "stand_in",
+    "libraries": {
+        "stand_in": {
+            "module": __name__,
+            "invoke_function": "invoke_client",
+            "client_class": "StandInLLM",
+            "client_args": {"model_name": "stand-in"},
+        },
+    },
+}
+
+def per_call_us(cache_clients, calls, repeats, middleware=()):
+    samples = []
+    for _ in range(repeats):
+        with DynamicAISDK(config=CONFIG, cache_clients=cache_clients) as sdk:
+            for make in middleware:
+                sdk.middleware.add(make())
+            sdk.invoke("warm up")
+            started = time.perf_counter()
+            for _ in range(calls):
+                sdk.invoke("What is the capital of France?")
+            samples.append((time.perf_counter() - started) / calls * 1e6)
+    return statistics.median(samples)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    before = per_call_us(False, args.calls, args.repeats)
+    after = per_call_us(True, args.calls * 10, args.repeats)
+    with_middleware = per_call_us(True, args.calls * 10, args.repeats, (TimingMiddleware, InFlightMiddleware))
+    print(f"client per invoke  {before:10.1f} us/call")
+    print(f"cached client      {after:10.1f} us/call")
+    print(f"speedup            {before / after:10.1f}x")
+    print(f"+ timing, in-flight middleware {with_middleware - after:+.1f} us/call")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Throughput of DynamicAISDK.invoke from many threads, with each call sent
+as its own backend request vs coalesced by enable_batching() into native
+batch calls.
+
+The stand-in backend behaves like a hosted endpoint: a fixed number of
+concurrent connections, a per-request round trip and a small per-prompt
+cost. It does no network I/O, so the numbers show the effect of batching
+on round trips only.
+
+Run from the v0/ directory:
+    python bench_microbatch.py
+    python bench_microbatch.py --threads 128 --calls 50 --round-trip-ms 20
+"""
+import time
+import argparse
+import threading
+import statistics
+
+from llmclient import DynamicAISDK
+
+class StandInEndpoint:
+    def __init__(self, connections=8, round_trip_ms=10.0, per_item_ms=0.2):
+        self._connections = threading.BoundedSemaphore(connections)
+        self.round_trip = round_trip_ms / 1000.0
+        self.per_item = per_item_ms / 1000.0
+        self.requests = 0
+
+    def _request(self, prompts):
+        with self._connections:
+            self.requests += 1
+            time.sleep(self.round_trip + self.per_item * len(prompts))
+            return [prompt.upper() for prompt in prompts]
+
+    def invoke(self, prompt):
+        return self._request([prompt])[0]
+
+    def batch(self, prompts):
+        return self._request(prompts)
+
+def config(args):
+    return {
+        "default_library": "stand_in",
+        "libraries": {
+            "stand_in": {
+                "module": __name__,
+                "invoke_function": "invoke_client",
+                "client_class": "StandInEndpoint",
+                "batch_method": "batch",
+                "client_args": {"connections": args.connections, "round_trip_ms": args.round_trip_ms},
+            },
+        },
+    }
+
+def run(args, batched):
+    with DynamicAISDK(config=config(args)) as sdk:
+        if batched:
+            sdk.enable_batching("stand_in", max_batch_size=args.max_batch_size, max_wait=args.max_wait_ms / 1000.0,
+                                max_in_flight=args.connections)
+        latencies = []
+
+        def worker(n):
+            for i in range(args.calls):
+                started = time.perf_counter()
+                sdk.invoke(f"prompt {n}-{i}")
+                latencies.append(time.perf_counter() - started)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.threads)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        endpoint = sdk.clients["stand_in"][1]
+        batch_stats = sdk.batchers["stand_in"].stats() if batched else None
+    latencies.sort()
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "requests": endpoint.requests,
+        "avg_batch": batch_stats["avg_batch_size"] if batch_stats else 1.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=64)
+    parser.add_argument("--calls", type=int, default=30)
+    parser.add_argument("--connections", type=int, default=4)
+    parser.add_argument("--round-trip-ms", type=float, default=10.0)
+    parser.add_argument("--max-batch-size", type=int, default=32)
+    parser.add_argument("--max-wait-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{args.threads} threads x {args.calls} calls, {args.connections} connections, "
+          f"{args.round_trip_ms:.0f} ms round trip")
+    results = {}
+    for label, batched in (("per-call", False), ("micro-batched", True)):
+        r = results[label] = run(args, batched)
+        print(f"{label:<14} {r['throughput']:8.0f} calls/s  p50 {r['p50_ms']:6.1f} ms  p99 {r['p99_ms']:6.1f} ms  "
+              f"backend requests {r['requests']:5d}  avg batch {r['avg_batch']:5.1f}")
+    print(f"throughput gain: {results['micro-batched']['throughput'] / results['per-call']['throughput']:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+"""
+Offline microbenchmarks for the SDK layer, using the fakes in
+fake_backends.py so no provider library or network is involved:
+
+  overhead     per-call cost of AIClientSDK and DynamicAISDK dispatch on top
+               of calling the client directly
+  import       interpreter start + import of each SDK module (fresh process)
+  memory       bytes per registered client, lazy (factory only) and built
+  concurrency  throughput against a fixed-latency backend as threads and
+               coroutines are added
+
+Run from the v0/ directory:
+    python bench_sdk.py
+    python bench_sdk.py --only overhead concurrency --latency-ms 20
+Each run is appended as one JSON line to --output for comparison across commits.
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import threading
+import statistics
+import subprocess
+import tracemalloc
+
+from llmclient import DynamicAISDK
+from langgraph import AIClientSDK
+from fake_backends import EchoLLM, FixedLatencyLLM
+
+def fake_config(client_class, **client_args):
+    return {
+        "default_library": "fake",
+        "libraries": {
+            "fake": {
+                "module": "fake_backends",
+                "invoke_function": "invoke_client",
+                "client_class": client_class,
+                "client_args": client_args,
+                "async_method": "ainvoke",
+                "batch_method": "batch",
+            },
+        },
+    }
+
+def ns_per_call(fn, calls, repeats=5):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter_ns()
+        for _ in range(calls):
+            fn()
+        samples.append((time.perf_counter_ns() - started) / calls)
+    return statistics.median(samples)
+
+def bench_overhead(args):
+    calls = args.calls
+    client = EchoLLM()
+    sdk = AIClientSDK()
+    sdk.register_factory("echo", EchoLLM)
+    pooled = AIClientSDK()
+    pooled.register_factory("echo", EchoLLM, pool_size=4)
+    dynamic = DynamicAISDK(config=fake_config("EchoLLM"))
+    dynamic.invoke("warm up")
+    results = {
+        "direct client.invoke": ns_per_call(lambda: client.invoke("q"), calls),
+        "AIClientSDK get_client().invoke": ns_per_call(lambda: sdk.get_client("echo").invoke("q"), calls),
+        "AIClientSDK call()": ns_per_call(lambda: sdk.call("echo", "invoke", "q"), calls),
+        "AIClientSDK pooled call()": ns_per_call(lambda: pooled.call("echo", "invoke", "q"), calls),
+        "DynamicAISDK invoke()": ns_per_call(lambda: dynamic.invoke("q"), calls),
+    }
+    dynamic.close()
+    base = results["direct client.invoke"]
+    for name, ns in results.items():
+        print(f"  {name:<34} {ns / 1000:8.2f} us/call  (+{(ns - base) / 1000:.2f} us)")
+    return {name: round(ns, 1) for name, ns in results.items()}
+
+def bench_import(args):
+    results = {}
+    for label, statement in (("interpreter", "pass"), ("llmclient", "import llmclient"),
+                             ("langgraph", "import langgraph")):
+        code = f"import time; t = time.perf_counter(); {statement}; print(time.perf_counter() - t)"
+        samples = []
+        for _ in range(args.import_runs):
+            started = time.perf_counter()
+            imported = float(subprocess.check_output([sys.executable, "-c", code], text=True))
+            samples.append((time.perf_counter() - started, imported))
+        results[label] = {"process_ms": statistics.median(s[0] for s in samples) * 1000,
+                          "import_ms": statistics.median(s[1] for s in samples) * 1000}
+        print(f"  {label:<12} process {results[label]['process_ms']:7.1f} ms  "
+              f"import {results[label]['import_ms']:7.1f} ms")
+    return results
+
+def bench_memory(args):
+    count = args.clients
+    results = {}
+    for label, build in (("lazy", False), ("built", True)):
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        sdk = AIClientSDK()
+        for i in range(count):
+            sdk.register_client(f"echo{i}", "fake_backends", "EchoLLM", {"response": f"r{i}"})
+        if build:
+            sdk.warm_all(parallel=False)
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        used = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+        results[f"AIClientSDK {label}"] = used / count
+        del sdk
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    config = fake_config("EchoLLM")
+    config["libraries"] = {f"echo{i}": dict(config["libraries"]["fake"], client_args={"response": f"r{i}"})
+                           for i in range(count)}
+    config["default_library"] = "echo0"
+    dynamic = DynamicAISDK(config=config)
+    for i in range(count):
+        dynamic.invoke("q", f"echo{i}")
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    results["DynamicAISDK built"] = sum(stat.size_diff for stat in after.compare_to(before, "filename")) / count
+    for name, size in results.items():
+        print(f"  {name:<22} {size:8.0f} bytes/client")
+    return {name: round(size) for name, size in results.items()}
+
+def threaded_throughput(call, threads, calls_per_thread):
+    def worker():
+        for _ in range(calls_per_thread):
+            call()
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return threads * calls_per_thread / (time.perf_counter() - started)
+
+def async_throughput(acall, tasks, calls_per_task):
+    async def main():
+        async def worker():
+            for _ in range(calls_per_task):
+                await acall()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(tasks)))
+        return tasks * calls_per_task / (time.perf_counter() - started)
+
+    return asyncio.run(main())
+
+def bench_concurrency(args):
+    latency = args.latency_ms / 1000.0
+    per_worker = max(1, int(0.5 / latency))
+    results = {}
+    print(f"  {'workers':>7}  {'AIClientSDK':>12}  {'pooled':>12}  {'Dynamic':>12}  {'Dynamic async':>14}  (calls/s)")
+    for workers in args.workers:
+        shared = AIClientSDK()
+        shared.register_factory("fake", lambda: FixedLatencyLLM(latency))
+        pooled = AIClientSDK()
+        pooled.register_factory("fake", lambda: FixedLatencyLLM(latency), pool_size=workers)
+        dynamic = DynamicAISDK(config=fake_config("FixedLatencyLLM", latency=latency))
+        row = {
+            "AIClientSDK": threaded_throughput(lambda: shared.call("fake", "invoke", "q"), workers, per_worker),
+            "pooled": threaded_throughput(lambda: pooled.call("fake", "invoke", "q"), workers, per_worker),
+            "DynamicAISDK": threaded_throughput(lambda: dynamic.invoke("q"), workers, per_worker),
+            "DynamicAISDK async": async_throughput(lambda: dynamic.ainvoke("q"), workers, per_worker),
+        }
+        dynamic.close()
+        results[workers] = {name: round(value, 1) for name, value in row.items()}
+        print(f"  {workers:>7}  {row['AIClientSDK']:12.0f}  {row['pooled']:12.0f}  {row['DynamicAISDK']:12.0f}  "
+              f"{row['DynamicAISDK async']:14.0f}")
+    print(f"  (ideal: workers / {args.latency_ms:g} ms = {1000 / args.latency_ms:.0f} calls/s per worker)")
+    return results
+
+BENCHMARKS = {"overhead": bench_overhead, "import": bench_import, "memory": bench_memory,
+              "concurrency": bench_concurrency}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument("--calls", type=int, default=20000, help="calls per overhead sample")
+    parser.add_argument("--import-runs", type=int, default=5)
+    parser.add_argument("--clients", type=int, default=1000, help="registered clients for the memory benchmark")
+    parser.add_argument("--latency-ms", type=float, default=10.0, help="fixed backend latency for concurrency")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--output", default="bench_sdk_results.jsonl")
+    args = parser.parse_args()
+
+    results = {}
+    for name in args.only:
+        print(f"{name}:")
+        results[name] = BENCHMARKS[name](args)
+    record = {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"), "python": platform.python_version(),
+              "config": {k: v for k, v in vars(args).items() if k != "output"}, "results": results}
+    with open(args.output, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Startup benchmark for AIClientSDK: time and peak memory to import the SDK,
+register a set of clients and use one of them, with eager (import at
+register time) vs lazy (import on first get_client) registration. The
+baseline row is the original SDK (BASELINE_SDK below: no pooling, eviction
+or middleware, every client built at register time), so a regression in the
+SDK's own import cost shows up too. Each run is a fresh interpreter so
+import caches do not leak between runs.
+
+Run from the v0/ directory:
+    python bench_startup.py
+    python bench_startup.py --client langchain_openai:langchain.llms:OpenAI   # add real providers
+"""
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+# Stand-ins that are importable everywhere; pass --client to add real provider libraries
+DEFAULT_CLIENTS = [
+    "cookies:http.cookiejar:CookieJar",
+    "email:email.message:EmailMessage",
+    "xml:xml.dom.minidom:Document",
+    "decimal:decimal:Context",
+    "difflib:difflib:SequenceMatcher",
+    "unittest:unittest:TestSuite",
+    "http:http.client:HTTPMessage",
+    "pydoc:pydoc:HTMLDoc",
+    "asyncio:asyncio:Queue",
+    "csv:csv:Sniffer",
+    "mailbox:mailbox:Message",
+    "tarfile:tarfile:TarInfo",
+]
+
+# AIClientSDK as it was before lazy registration, for the baseline row
+BASELINE_SDK = """
+import importlib
+from typing import Any, Dict
+
+class AIClientSDK:
+    def __init__(self):
+        self.clients = {}
+
+    def register_client(self, name: str, module_name: str, class_name: str, init_args: Dict[str, Any] = {}):
+        module = importlib.import_module(module_name)
+        self.clients[name] = getattr(module, class_name)(**init_args)
+
+    def get_client(self, name: str) -> Any:
+        return self.clients[name]
+"""
+
+CHILD = """
+import json, sys, time, resource
+mode = sys.argv[2]
+started = time.perf_counter()
+if mode == "baseline":
+    exec(sys.argv[3])
+else:
+    from langgraph import AIClientSDK
+imported = time.perf_counter()
+sdk = AIClientSDK()
+clients = json.loads(sys.argv[1])
+for name, module, cls in clients:
+    if mode == "baseline":
+        sdk.register_client(name, module, cls)
+    else:
+        sdk.register_client(name, module, cls, lazy=mode == "lazy")
+registered = time.perf_counter()
+sdk.get_client(clients[0][0])
+done = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "register_ms": (registered - started) * 1000,
+    "first_use_ms": (done - started) * 1000,
+    "max_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    "modules": len(sys.modules),
+}))
+"""
+
+def run_child(mode, clients):
+    out = subprocess.check_output([sys.executable, "-c", CHILD, json.dumps(clients), mode, BASELINE_SDK], text=True)
+    return json.loads(out)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--client", action="append", help="name:module:Class, may be repeated")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    clients = [spec.split(":") for spec in (args.client or []) + DEFAULT_CLIENTS]
+    print(f"{len(clients)} registered clients, first use of '{clients[0][0]}', {args.runs} runs each")
+    summary = {}
+    for mode in ("baseline", "eager", "lazy"):
+        runs = [run_child(mode, clients) for _ in range(args.runs)]
+        summary[mode] = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+        s = summary[mode]
+        print(f"{mode:<8} import {s['import_ms']:6.1f} ms  register {s['register_ms']:7.1f} ms  "
+              f"first use {s['first_use_ms']:7.1f} ms  "
+              f"rss {s['max_rss_mb']:6.1f} MB  modules {s['modules']:.0f}")
+    print(f"import-time saving at startup: {summary['eager']['register_ms'] - summary['lazy']['register_ms']:.1f} ms "
+          f"vs eager, {summary['baseline']['register_ms'] - summary['lazy']['register_ms']:.1f} ms vs baseline; "
+          f"SDK import {summary['lazy']['import_ms'] - summary['baseline']['import_ms']:+.1f} ms vs baseline")
+
+if __name__ == "__main__":
+    main()
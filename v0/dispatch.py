@@ -0,0 +1,159 @@
+import os
+import copy
+import importlib
+import importlib.util
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, NamedTuple, Optional
+
+class ConfigError(ValueError):
+    """The config is malformed or names a module/function that cannot be loaded."""
+
+
+class Route(NamedTuple):
+    """Everything invoke needs for one library, resolved ahead of the call."""
+    library: str
+    entry: Dict[str, Any]
+    invoke: Callable[..., Any]
+    ainvoke: Optional[Callable[..., Any]]
+    batch: Optional[Callable[..., Any]]
+    abatch: Optional[Callable[..., Any]]
+    stream: Optional[Callable[..., Any]]
+    astream: Optional[Callable[..., Any]]
+
+
+class DispatchTable:
+    """
+    Compiled form of a DynamicAISDK config. Never mutated after compile():
+    a reload builds a new table and swaps the reference, so calls already
+    dispatched through the old table finish against it.
+    """
+
+    def __init__(self, config: Dict[str, Any], routes: Mapping[str, Route], modules: Dict[str, Any],
+                 version: int = 0):
+        self.config = config
+        self.default_library = config.get("default_library", "langchain")
+        self.routes = MappingProxyType(dict(routes))
+        # Filled lazily for libraries that were not pre-imported
+        self.modules = modules
+        self.version = version
+
+    def route(self, library: Optional[str]) -> Route:
+        library = library or self.default_library
+        route = self.routes.get(library)
+        if route is None:
+            raise ValueError(f"Library '{library}' is not supported. Add it in config.yaml.")
+        return route
+
+    def module(self, library: str) -> Any:
+        if library not in self.modules:
+            self.modules[library] = importlib.import_module(self.route(library).entry["module"])
+        return self.modules[library]
+
+
+def compile_config(config: Dict[str, Any], owner: Any, preload: bool = False, version: int = 0,
+                   known: Optional[Mapping[str, Any]] = None) -> DispatchTable:
+    """
+    Validate a config and resolve each library's invoke_function (and its
+    ainvoke_/batch_/abatch_/stream_/astream_ counterparts) on `owner`. A
+    routing section must list its candidate libraries explicitly. With
+    preload, every configured module is imported now, so a config naming a
+    missing module is rejected instead of failing on first use. Without it,
+    entries that are new or differ from `known` (the libraries of the config
+    being replaced) are still checked with importlib.util.find_spec, which
+    locates the module without running it.
+    """
+    if not isinstance(config, dict) or not isinstance(config.get("libraries"), dict) or not config["libraries"]:
+        raise ConfigError("Config must have a non-empty 'libraries' mapping.")
+    config = copy.deepcopy(config)
+    default = config.get("default_library")
+    if default is not None and default not in config["libraries"]:
+        raise ConfigError(f"default_library '{default}' is not one of the configured libraries.")
+    routing = config.get("routing")
+    if routing is not None:
+        # Every configured library is not a safe candidate (langsmith only logs), so the list must be explicit
+        routed = routing.get("libraries") if isinstance(routing, dict) else None
+        if not isinstance(routed, list) or not routed:
+            raise ConfigError("routing needs an explicit, non-empty 'libraries' list.")
+        unknown = [library for library in routed if library not in config["libraries"]]
+        if unknown:
+            raise ConfigError(f"routing libraries {unknown} are not among the configured libraries.")
+
+    routes = {}
+    modules = {}
+    for library, entry in config["libraries"].items():
+        if not isinstance(entry, dict) or "module" not in entry or "invoke_function" not in entry:
+            raise ConfigError(f"Library '{library}' needs 'module' and 'invoke_function'.")
+        name = entry["invoke_function"]
+        invoke = getattr(owner, name, None)
+        if not name.startswith("invoke") or not callable(invoke):
+            raise ConfigError(f"Library '{library}': unknown invoke_function '{name}'.")
+        suffix = name[len("invoke"):]
+        routes[library] = Route(library, entry, invoke,
+                                *(getattr(owner, prefix + suffix, None)
+                                  for prefix in ("ainvoke", "batch", "abatch", "stream", "astream")))
+        if preload:
+            try:
+                modules[library] = importlib.import_module(entry["module"])
+            except ImportError as e:
+                raise ConfigError(f"Library '{library}': cannot import '{entry['module']}': {e}")
+            if "client_class" in entry and not hasattr(modules[library], entry["client_class"]):
+                raise ConfigError(f"Library '{library}': '{entry['module']}' has no '{entry['client_class']}'.")
+        elif known is not None and known.get(library) != entry:
+            try:
+                found = importlib.util.find_spec(entry["module"]) is not None
+            except (ImportError, ValueError):
+                found = False
+            if not found:
+                raise ConfigError(f"Library '{library}': cannot find module '{entry['module']}'.")
+    return DispatchTable(config, routes, modules, version)
+
+
+class ConfigWatcher:
+    """
+    Polls a file's mtime and size from a daemon thread and calls on_change()
+    when either moves. Errors from on_change are kept in last_error; the
+    next change of the file is tried again.
+    """
+
+    def __init__(self, path: str, on_change: Callable[[], Any], interval: float = 1.0):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self.last_error = None
+        self.changes = 0
+        self._signature = self._stat()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="config-watcher", daemon=True)
+        self._thread.start()
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def poll(self) -> bool:
+        """Check the file now; True if it changed and on_change succeeded."""
+        signature = self._stat()
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        self.changes += 1
+        try:
+            self.on_change()
+        except Exception as e:
+            self.last_error = e
+            return False
+        self.last_error = None
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join()
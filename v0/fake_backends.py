@@ -0,0 +1,113 @@
+"""
+Offline stand-ins for provider clients, for benchmarks and tests without
+network access or provider libraries. Each exposes invoke/ainvoke,
+batch/abatch and stream/astream, so they work with
+AIClientSDK.register_client("echo", "fake_backends", "EchoLLM") and with
+DynamicAISDK config entries like the ones in config.fake.yaml
+(DynamicAISDK(config_path="config.fake.yaml")):
+
+    echo:
+      module: fake_backends
+      invoke_function: invoke_client
+      client_class: EchoLLM
+      async_method: ainvoke
+      batch_method: batch
+      stream_method: stream
+      astream_method: astream
+"""
+import time
+import asyncio
+from typing import Any, AsyncIterator, Iterator, List, Optional
+
+class EchoLLM:
+    """Answers immediately with the query (or a fixed response)."""
+
+    def __init__(self, response: Optional[str] = None, **_ignored: Any):
+        self.response = response
+        self.calls = 0
+        self.closed = False
+
+    def _answer(self, query: str) -> str:
+        self.calls += 1
+        return query if self.response is None else self.response
+
+    def _delay(self, query: str) -> float:
+        return 0.0
+
+    def invoke(self, query: str) -> str:
+        delay = self._delay(query)
+        if delay:
+            time.sleep(delay)
+        return self._answer(query)
+
+    async def ainvoke(self, query: str) -> str:
+        delay = self._delay(query)
+        if delay:
+            await asyncio.sleep(delay)
+        return self._answer(query)
+
+    def batch(self, queries: List[str]) -> List[str]:
+        """One simulated round trip for the whole batch."""
+        delay = max((self._delay(query) for query in queries), default=0.0)
+        if delay:
+            time.sleep(delay)
+        return [self._answer(query) for query in queries]
+
+    async def abatch(self, queries: List[str]) -> List[str]:
+        delay = max((self._delay(query) for query in queries), default=0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        return [self._answer(query) for query in queries]
+
+    def stream(self, query: str) -> Iterator[str]:
+        yield self.invoke(query)
+
+    async def astream(self, query: str) -> AsyncIterator[str]:
+        yield await self.ainvoke(query)
+
+    def close(self):
+        self.closed = True
+
+
+class FixedLatencyLLM(EchoLLM):
+    """Echo that takes `latency` seconds per call, like a backend with a constant response time."""
+
+    def __init__(self, latency: float = 0.05, response: Optional[str] = None, **_ignored: Any):
+        super().__init__(response)
+        self.latency = latency
+
+    def _delay(self, query: str) -> float:
+        return self.latency
+
+
+class StreamingLLM(EchoLLM):
+    """
+    Streams the answer word by word: the first token after `first_token_latency`,
+    then one every 1 / tokens_per_second seconds. invoke waits for the whole answer.
+    """
+
+    def __init__(self, first_token_latency: float = 0.05, tokens_per_second: float = 50.0,
+                 response: Optional[str] = None, **_ignored: Any):
+        super().__init__(response)
+        self.first_token_latency = first_token_latency
+        self.tokens_per_second = tokens_per_second
+
+    def _delay(self, query: str) -> float:
+        tokens = len(self._tokens_of(query))
+        return self.first_token_latency + (tokens - 1) / self.tokens_per_second
+
+    def _tokens_of(self, query: str) -> List[str]:
+        words = (query if self.response is None else self.response).split(" ")
+        return [word + " " for word in words[:-1]] + words[-1:]
+
+    def stream(self, query: str) -> Iterator[str]:
+        self.calls += 1
+        for index, token in enumerate(self._tokens_of(query)):
+            time.sleep(self.first_token_latency if index == 0 else 1.0 / self.tokens_per_second)
+            yield token
+
+    async def astream(self, query: str) -> AsyncIterator[str]:
+        self.calls += 1
+        for index, token in enumerate(self._tokens_of(query)):
+            await asyncio.sleep(self.first_token_latency if index == 0 else 1.0 / self.tokens_per_second)
+            yield token
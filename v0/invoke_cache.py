@@ -0,0 +1,119 @@
+import os
+import sys
+import json
+import time
+import pickle
+import hashlib
+import asyncio
+import unicodedata
+from typing import Any, Dict, Iterable, Optional
+
+# The LRU and SQLite tiers and their counters are the HTTP client's (v/cache.py), shared rather than copied
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "v"))
+from cache import CacheStats, MemoryCache, SQLiteCache
+
+MISS = object()
+
+def normalize_query(query: str) -> str:
+    """Unicode NFC with runs of whitespace collapsed, so trivially different spellings share an entry."""
+    return " ".join(unicodedata.normalize("NFC", query).split())
+
+def invoke_key(library: str, model_config: Dict[str, Any], query: str) -> str:
+    canonical = json.dumps({"library": library, "config": model_config, "query": normalize_query(query)},
+                           sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class InvokeCacheStats(CacheStats):
+    """Thread-safe hit/miss counters and the backend time hits avoided."""
+
+    FIELDS = dict(CacheStats.FIELDS, latency_saved=0.0)
+
+    def _snapshot(self) -> Dict[str, Any]:
+        snapshot = super()._snapshot()
+        snapshot["latency_saved_seconds"] = snapshot.pop("latency_saved")
+        return snapshot
+
+
+class InvokeCache:
+    """
+    Opt-in two-tier cache for DynamicAISDK.invoke results: a memory LRU in
+    front of an optional disk tier in `directory`, which several worker
+    processes may share. Results are pickled, so only point `directory`
+    at a location you trust. `libraries` limits caching to those names
+    (None caches every library); enable()/disable() change it at runtime.
+    """
+
+    def __init__(self, directory: Optional[str] = None, ttl: Optional[float] = None,
+                 memory_entries: int = 4096, memory_bytes: int = 64 * 1024 * 1024,
+                 disk_bytes: int = 1024 * 1024 * 1024, libraries: Optional[Iterable[str]] = None):
+        self.stats = InvokeCacheStats()
+        self.memory = MemoryCache(memory_entries, memory_bytes, self.stats)
+        self.disk = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self.disk = SQLiteCache(os.path.join(directory, "invoke_cache.sqlite3"), disk_bytes, self.stats)
+        self.ttl = ttl
+        self.libraries = None if libraries is None else set(libraries)
+        self.disabled = set()
+
+    def enabled(self, library: str) -> bool:
+        return library not in self.disabled and (self.libraries is None or library in self.libraries)
+
+    def enable(self, library: str):
+        self.disabled.discard(library)
+        if self.libraries is not None:
+            self.libraries.add(library)
+
+    def disable(self, library: str):
+        self.disabled.add(library)
+
+    def key(self, library: str, model_config: Dict[str, Any], query: str) -> str:
+        return invoke_key(library, model_config, query)
+
+    def get(self, key: str) -> Any:
+        """Return the cached result, or MISS."""
+        payload = self.memory.get(key)
+        if payload is not None:
+            tier = "memory_hits"
+        elif self.disk is not None and (row := self.disk.get(key)) is not None:
+            payload, expires_at = row
+            self.memory.set(key, payload, expires_at)
+            tier = "disk_hits"
+        else:
+            self.stats.add(misses=1)
+            return MISS
+        value, elapsed = pickle.loads(payload)
+        self.stats.add(**{tier: 1, "latency_saved": elapsed})
+        return value
+
+    def set(self, key: str, value: Any, elapsed: float = 0.0):
+        """Store a result with the backend time it took, which later hits count as saved."""
+        try:
+            payload = pickle.dumps((value, elapsed), protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return
+        expires_at = time.time() + self.ttl if self.ttl else None
+        self.memory.set(key, payload, expires_at)
+        if self.disk is not None:
+            self.disk.set(key, payload, expires_at)
+        self.stats.add(stores=1)
+
+    async def aget(self, key: str) -> Any:
+        if self.disk is None:
+            return self.get(key)
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: Any, elapsed: float = 0.0):
+        if self.disk is None:
+            return self.set(key, value, elapsed)
+        await asyncio.to_thread(self.set, key, value, elapsed)
+
+    def clear(self):
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def close(self):
+        if self.disk is not None:
+            self.disk.close()
@@ -1,25 +1,340 @@
+import time
 import importlib
-from typing import Any, Dict
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+from pool import ClientPool, close_client, estimate_size
+from middleware import Call, Pipeline
+from transport import SharedTransports
+
+if TYPE_CHECKING:
+    from microbatch import MicroBatcher
 
 class AIClientSDK:
-    def __init__(self):
-        """Initialize the SDK with dynamic client handling."""
-        self.clients = {}
+    def __init__(self, max_clients: Optional[int] = None, max_bytes: Optional[int] = None,
+                 idle_timeout: Optional[float] = None, transports: Optional[SharedTransports] = None):
+        """
+        Initialize the SDK with dynamic client handling.
 
-    def register_client(self, name: str, module_name: str, class_name: str, init_args: Dict[str, Any] = {}):
-        """Dynamically register a client and store its instance."""
-        try:
-            module = importlib.import_module(module_name)
-            client_class = getattr(module, class_name)
-            self.clients[name] = client_class(**init_args)
-        except (ImportError, AttributeError) as e:
-            raise RuntimeError(f"Error loading {class_name} from {module_name}: {e}")
+        Shared (non-pooled) clients are kept in LRU order. When more than
+        `max_clients` are built, their estimated size exceeds `max_bytes`, or
+        one has not been used for `idle_timeout` seconds, the least recently
+        used are closed and dropped; the next use rebuilds them from their
+        factory. Clients checked out at the time are never evicted. Limits are
+        checked whenever a client is built, and idle clients are also swept
+        while others are in use (at most every idle_timeout / 2 seconds), so
+        a worker that keeps using one client still closes the rest; there is
+        no background thread, and evict_idle() forces a sweep.
+
+        Clients built by register_client that accept an HTTP client or
+        session get the shared one for their host from `transports` (owned
+        and closed by the SDK unless passed in).
+        """
+        self.clients = OrderedDict()
+        self.factories = {}
+        self.specs = {}
+        self.pools = {}
+        self.middleware = Pipeline(self._call, self._acall)
+        self.max_clients = max_clients
+        self.max_bytes = max_bytes
+        self.idle_timeout = idle_timeout
+        self.transports = transports if transports is not None else SharedTransports()
+        self._owns_transports = transports is None
+        self.evictions = {"lru": 0, "bytes": 0, "idle": 0}
+        self.rebuilds = 0
+        self._bounded = max_clients is not None or max_bytes is not None or idle_timeout is not None
+        self._sizes = {}
+        self._size_hints = {}
+        self._last_used = {}
+        self._in_use = {}
+        self._evicted = set()
+        self._next_sweep = 0.0
+        self._lock = threading.Lock()
+        self._name_locks = {}
+
+    def register_client(self, name: str, module_name: str, class_name: str, init_args: Dict[str, Any] = {},
+                        lazy: bool = True, pool_size: Optional[int] = None, pool_min: int = 0,
+                        idle_timeout: Optional[float] = None, size_bytes: Optional[int] = None,
+                        shared_http: bool = True):
+        """
+        Register a client by module and class name. The module is imported and
+        the client constructed on the first get_client, unless lazy is False.
+        With pool_size set, the name is served from a pool of instances
+        through checkout() instead of a single shared instance. `size_bytes`
+        overrides the estimated size counted against max_bytes; shared_http
+        False keeps the client's own HTTP client instead of the shared one.
+        """
+        def factory():
+            try:
+                module = importlib.import_module(module_name)
+                client_class = getattr(module, class_name)
+                args = self.transports.inject(client_class, init_args) if shared_http else init_args
+                return client_class(**args)
+            except (ImportError, AttributeError) as e:
+                raise RuntimeError(f"Error loading {class_name} from {module_name}: {e}")
+
+        self.register_factory(name, factory, lazy=lazy, pool_size=pool_size, pool_min=pool_min,
+                              idle_timeout=idle_timeout, size_bytes=size_bytes,
+                              spec={"module": module_name, "class": class_name, "init_args": init_args})
+
+    def register_factory(self, name: str, factory: Callable[[], Any], lazy: bool = True,
+                         pool_size: Optional[int] = None, pool_min: int = 0, idle_timeout: Optional[float] = None,
+                         size_bytes: Optional[int] = None, spec: Optional[Dict[str, Any]] = None):
+        """
+        Register a zero-argument callable that builds the client on first use.
+        `spec` describes what it builds (passed to middleware as Call.config,
+        e.g. for cache keys); it defaults to the factory's qualified name.
+        """
+        if spec is None:
+            spec = {"factory": f"{getattr(factory, '__module__', '')}.{getattr(factory, '__qualname__', factory)}"}
+        with self._lock:
+            self.factories[name] = factory
+            self.specs[name] = spec
+            self.clients.pop(name, None)
+            self._forget(name)
+            self._evicted.discard(name)
+            if size_bytes is None:
+                self._size_hints.pop(name, None)
+            else:
+                self._size_hints[name] = size_bytes
+            self._name_locks.setdefault(name, threading.Lock())
+            old_pool = self.pools.pop(name, None)
+            if pool_size:
+                self.pools[name] = ClientPool(factory, pool_size, pool_min, idle_timeout)
+        if old_pool is not None:
+            old_pool.close_all()
+        if not lazy:
+            self.warm(name)
 
     def get_client(self, name: str) -> Any:
-        """Retrieve a registered client instance by name."""
-        if name not in self.clients:
+        """
+        Retrieve a registered client instance by name, building it on first use
+        (or again after eviction). With eviction enabled, hold on to it through
+        checkout() rather than keeping the returned reference.
+        """
+        client = self.clients.get(name)
+        if client is not None:
+            if self._bounded:
+                self._touch(name)
+            return client
+        if name not in self.factories:
             raise ValueError(f"Client '{name}' is not registered.")
-        return self.clients[name]
+        if name in self.pools:
+            raise ValueError(f"Client '{name}' is pooled; use checkout('{name}') instead.")
+        # Per-name lock: concurrent first calls build the client once, other names are not blocked
+        with self._name_locks[name]:
+            client = self.clients.get(name)
+            if client is not None:
+                return client
+            client = self.factories[name]()
+            if not self._bounded:
+                self.clients[name] = client
+                return client
+            size = self._size_hints.get(name)
+            if size is None and self.max_bytes is not None:
+                size = estimate_size(client)
+            with self._lock:
+                self.clients[name] = client
+                self._sizes[name] = size or 0
+                self._last_used[name] = time.monotonic()
+                if name in self._evicted:
+                    self._evicted.discard(name)
+                    self.rebuilds += 1
+                evicted = self._select_evictions(keep=name)
+        for victim in evicted:
+            close_client(victim)
+        return client
+
+    def _touch(self, name: str):
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            if name in self.clients:
+                self.clients.move_to_end(name)
+                self._last_used[name] = now
+            if self.idle_timeout is not None and now >= self._next_sweep:
+                self._next_sweep = now + self.idle_timeout / 2
+                evicted = self._select_evictions(keep=name)
+        for victim in evicted:
+            close_client(victim)
+
+    def _forget(self, name: str):
+        self._sizes.pop(name, None)
+        self._last_used.pop(name, None)
+
+    def _select_evictions(self, keep: Optional[str] = None) -> list:
+        """Drop clients over the idle, count and byte limits (LRU first); call with _lock held."""
+        evicted = []
+
+        def evict(name, reason):
+            evicted.append(self.clients.pop(name))
+            self._forget(name)
+            self._evicted.add(name)
+            self.evictions[reason] += 1
+
+        candidates = [name for name in self.clients if name != keep and not self._in_use.get(name)]
+        if self.idle_timeout is not None:
+            cutoff = time.monotonic() - self.idle_timeout
+            for name in [name for name in candidates if self._last_used.get(name, 0.0) < cutoff]:
+                evict(name, "idle")
+                candidates.remove(name)
+        # OrderedDict order is least recently used first
+        for name in candidates:
+            if self.max_clients is not None and len(self.clients) > self.max_clients:
+                evict(name, "lru")
+            elif self.max_bytes is not None and sum(self._sizes.values()) > self.max_bytes:
+                evict(name, "bytes")
+            else:
+                break
+        return evicted
+
+    @contextmanager
+    def checkout(self, name: str, timeout: Optional[float] = None):
+        """
+        Borrow a client for the duration of a with-block. Pooled names hand out
+        an exclusive instance (waiting up to `timeout` if all are in use);
+        other names yield their shared instance.
+        """
+        pool = self.pools.get(name)
+        if pool is not None:
+            if self._bounded:
+                self._touch(name)
+            with pool.checkout(timeout) as client:
+                yield client
+            return
+        if not self._bounded:
+            yield self.get_client(name)
+            return
+        # Pin the name so it is not evicted (and closed) while the caller uses it
+        with self._lock:
+            self._in_use[name] = self._in_use.get(name, 0) + 1
+        try:
+            yield self.get_client(name)
+        finally:
+            with self._lock:
+                self._in_use[name] -= 1
+                if not self._in_use[name]:
+                    del self._in_use[name]
+                if name in self._last_used:
+                    self._last_used[name] = time.monotonic()
+
+    def call(self, name: str, method: str, *args, **kwargs) -> Any:
+        """Call `method` on a client (checked out from its pool if pooled) through the middleware chain."""
+        if self.middleware:
+            return self.middleware.invoke(Call(name, method, args, kwargs, config=self.specs.get(name)))
+        with self.checkout(name) as client:
+            return getattr(client, method)(*args, **kwargs)
+
+    async def acall(self, name: str, method: str, *args, **kwargs) -> Any:
+        """Await the async `method` on a client through the middleware chain."""
+        if self.middleware:
+            return await self.middleware.ainvoke(Call(name, method, args, kwargs, config=self.specs.get(name)))
+        with self.checkout(name) as client:
+            return await getattr(client, method)(*args, **kwargs)
+
+    def _call(self, call: Call) -> Any:
+        with self.checkout(call.library) as client:
+            return getattr(client, call.method)(*call.args, **call.kwargs)
+
+    async def _acall(self, call: Call) -> Any:
+        with self.checkout(call.library) as client:
+            return await getattr(client, call.method)(*call.args, **call.kwargs)
+
+    def batcher(self, name: str, method: str = "batch", **options) -> "MicroBatcher":
+        """
+        MicroBatcher that gathers single items submitted from many threads
+        and sends them as one `client.<method>(items)` call, e.g. a
+        multi-prompt generate or an embeddings array. `options` are passed
+        to MicroBatcher (max_batch_size, max_wait, ...); close it when done.
+        """
+        def run_batch(items):
+            with self.checkout(name) as client:
+                return getattr(client, method)(items)
+
+        from microbatch import MicroBatcher
+        return MicroBatcher(run_batch, **options)
+
+    def is_loaded(self, name: str) -> bool:
+        """Whether the client has already been imported and constructed."""
+        if name in self.pools:
+            return self.pools[name].stats()["size"] > 0
+        return name in self.clients
+
+    def warm(self, name: str) -> Any:
+        """Import and construct a client ahead of its first use."""
+        if name in self.pools:
+            pool = self.pools[name]
+            return pool.prefill(max(pool.min_size, 1))
+        return self.get_client(name)
+
+    def pool_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Size, checkout and wait-time metrics for every pooled client."""
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+    def evict_idle(self) -> int:
+        """
+        Close pooled instances idle past their idle_timeout, and shared clients
+        idle past the SDK's idle_timeout or over its count and byte limits.
+        """
+        with self._lock:
+            evicted = self._select_evictions()
+        for client in evicted:
+            close_client(client)
+        return len(evicted) + sum(pool.evict_idle() for pool in self.pools.values())
+
+    def client_stats(self) -> Dict[str, Any]:
+        """Shared clients held, their estimated bytes, and evictions by reason."""
+        with self._lock:
+            return {
+                "clients": len(self.clients),
+                "bytes": sum(self._sizes.values()),
+                "max_clients": self.max_clients,
+                "max_bytes": self.max_bytes,
+                "in_use": sum(self._in_use.values()),
+                "evictions": dict(self.evictions),
+                "evicted_total": sum(self.evictions.values()),
+                "rebuilds": self.rebuilds,
+            }
+
+    def close(self):
+        """Close every shared client, pool and the SDK's HTTP transports; clients are rebuilt if used again."""
+        with self._lock:
+            clients = list(self.clients.values())
+            self.clients.clear()
+            self._sizes.clear()
+            self._last_used.clear()
+            pools = list(self.pools.values())
+            self.pools = {name: ClientPool(pool.factory, pool.max_size, pool.min_size, pool.idle_timeout)
+                          for name, pool in self.pools.items()}
+        for client in clients:
+            close_client(client)
+        for pool in pools:
+            pool.close_all()
+        if self._owns_transports:
+            self.transports.close()
+
+    def warm_all(self, parallel: bool = True, max_workers: Optional[int] = None) -> Dict[str, Exception]:
+        """
+        Pre-load every registered client, in a thread pool when parallel is
+        True. Returns the clients that failed to load, mapped to their error.
+        """
+        def load(name):
+            try:
+                self.warm(name)
+            except Exception as e:
+                return name, e
+            return name, None
+
+        names = list(self.factories)
+        if parallel and len(names) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="client-warm") as pool:
+                results = list(pool.map(load, names))
+        else:
+            results = [load(name) for name in names]
+        return {name: error for name, error in results if error is not None}
 
 
 # Example Usage
@@ -38,4 +353,4 @@ if __name__ == "__main__":
 
     # Get LangChain OpenAI Client
     langchain_client = sdk.get_client("langchain_openai")
-    print(langchain_client)  # Returns the OpenAI client instance
\ No newline at end of file
+    print(langchain_client)  # Returns the OpenAI client instance
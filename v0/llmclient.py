@@ -1,80 +1,738 @@
-import importlib
+import time
+import asyncio
+import itertools
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
 import yaml
-from typing import Any, Dict, Optional
+
+from pool import close_client
+from dispatch import ConfigError, ConfigWatcher, DispatchTable, Route, compile_config
+from invoke_cache import MISS, InvokeCache
+from routing import Router
+from token_stream import TokenStream
+from microbatch import MicroBatcher
+from middleware import Call, Pipeline
+from transport import SharedTransports
+
+def _freeze(value: Any) -> Any:
+    """Hashable form of a (possibly nested) client config, used as a cache key."""
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+_END = object()
+
+def _native_batch(batch_call: Callable[[List[str]], List[Any]], queries: List[str]) -> List[Any]:
+    """A batch call fails as a whole; report that error against every query in it."""
+    try:
+        results = list(batch_call(queries))
+    except Exception as e:
+        return [e] * len(queries)
+    if len(results) != len(queries):
+        error = RuntimeError(f"Batch call returned {len(results)} results for {len(queries)} queries.")
+        return [error] * len(queries)
+    return results
+
+def _primed(chunks: Iterator[Any]) -> Iterator[Any]:
+    """Pull the first chunk now, so a stream's middleware times and retries everything up to it."""
+    first = next(chunks, _END)
+    if first is _END:
+        return iter(())
+    return itertools.chain((first,), chunks)
+
+async def _aprimed(chunks: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    """Async _primed: await the first chunk, then return an iterator over all of them."""
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = _END
+
+    async def replay():
+        if first is _END:
+            return
+        yield first
+        async for chunk in chunks:
+            yield chunk
+
+    return replay()
+
+def _check_results(results: List[Any], return_exceptions: bool) -> List[Any]:
+    if not return_exceptions:
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+    return results
+
 
 class DynamicAISDK:
-    def __init__(self, config_path: str = "config.yaml"):
-        """Initialize SDK with configuration-based dynamic library loading."""
-        self.config = self.load_config(config_path)
+    """
+    Dispatches queries to the libraries listed in config.yaml. Each entry
+    names the module to import and the invoke_* method that handles it:
+
+        default_library: langchain
+        libraries:
+          langchain:
+            module: langchain.llms
+            invoke_function: invoke_langchain
+            client_args: {model_name: gpt-3.5-turbo}
+
+    The config is compiled into an immutable DispatchTable; reload() or
+    watch() swap in a new one without a restart, including a new
+    default_library (unless active_library was pinned by assignment).
+
+    Backend clients are built once per (library, client_args) and reused
+    across invokes; they are rebuilt only when client_args change and
+    closed by close() or on leaving a with-block. Clients that accept an
+    HTTP client or session (the OpenAI LLMs, langsmith.Client) share one
+    per host from SharedTransports, tuned by an `http:` section such as
+    `{max_connections: 50}`; `http: false` or an entry's `shared_http:
+    false` turns this off.
+
+    With a Router (passed in, or built from a `routing:` section such as
+    `{strategy: power_of_two, libraries: [a, b]}`, where the libraries list
+    is required), calls that name no library and have no pinned
+    active_library go to the backend the router picks from live latency,
+    error-rate and in-flight statistics.
+
+    Middleware added with sdk.middleware.add(...) wraps every invoke,
+    ainvoke, batch, abatch, stream and astream (see middleware.py for timing,
+    in-flight, retry and cache).
+
+    enable_batching(library) coalesces concurrent invokes to a library into
+    native batch calls through a MicroBatcher.
+
+    With an InvokeCache, results are cached by library, model config and
+    normalized query; a library entry with `cache: false` is never cached.
+
+    ainvoke, batch, abatch, stream and astream use the `ainvoke_*`,
+    `batch_*`, `abatch_*`, `stream_*` or `astream_*` method matching the
+    library's invoke_function when there is one (the backend's native call),
+    and otherwise fall back to invoke: fanned out with bounded concurrency
+    for batches, as a single chunk for streams.
+    """
+
+    def __init__(self, config_path: str = "config.yaml", config: Optional[Dict[str, Any]] = None,
+                 cache_clients: bool = True, preload: bool = False, retire_grace: float = 30.0,
+                 cache: Optional[InvokeCache] = None, router: Optional[Router] = None,
+                 transports: Optional[SharedTransports] = None):
+        self.config_path = config_path
+        if config is None:
+            config = self._read_config()
+        self.cache_clients = cache_clients
+        self.preload = preload
+        self.cache = cache
+        self.retire_grace = retire_grace
+        self.clients = {}
         self.module_cache = {}
-        self.active_library = self.config.get("default_library", "langchain")
+        self.batchers = {}
+        self.middleware = Pipeline(self._invoke_call, self._ainvoke_call)
+        self.reloads = 0
+        self._retired = []
+        self._retire_timer = None
+        self._pinned_library = None
+        self._watcher = None
+        self._lock = threading.Lock()
+        self._table = compile_config(config, self, preload=preload)
+        self.router = router
+        if router is None and self._table.config.get("routing") is not None:
+            self.router = self._configure_router(self._table.config["routing"])
+        self.transports = transports
+        self._external_transports = transports is not None
+        self._owns_transports = transports is None and self._table.config.get("http", {}) is not False
+        if self._owns_transports:
+            self.transports = self._configure_transports(self._table.config.get("http") or {})
 
     def load_config(self, path: str) -> Dict[str, Any]:
         """Load the YAML configuration file."""
         with open(path, "r") as file:
             return yaml.safe_load(file)
 
-    def load_library(self, library_name: str):
-        """Dynamically import a library based on config."""
-        library_info = self.config["libraries"].get(library_name)
-        if not library_info:
-            raise ValueError(f"Library '{library_name}' is not configured. Add it to config.yaml.")
+    def _read_config(self) -> Dict[str, Any]:
+        return self.load_config(self.config_path)
+
+    @property
+    def config(self) -> Dict[str, Any]:
+        return self._table.config
+
+    @config.setter
+    def config(self, config: Dict[str, Any]):
+        # Assigning a config swaps it in like reload(config), so it is validated first
+        self.reload(config)
+
+    def _configure_router(self, routing: Dict[str, Any]) -> Router:
+        try:
+            if self.router is None:
+                return Router(**routing)
+            self.router.configure(**routing)
+            return self.router
+        except (TypeError, ValueError) as e:
+            raise ConfigError(f"Invalid routing section: {e}")
+
+    def _configure_transports(self, http: Dict[str, Any]) -> SharedTransports:
+        try:
+            return SharedTransports(**http)
+        except TypeError as e:
+            raise ConfigError(f"Invalid http section: {e}")
 
-        module_name = library_info["module"]
+    @property
+    def active_library(self) -> Optional[str]:
+        """The pinned library if one was set, else the config's default_library."""
+        return self._pinned_library or self._table.default_library
+
+    def _route(self, library: Optional[str]) -> Route:
+        """
+        An explicit library wins, then a pinned active_library; otherwise the
+        router (if any) picks from the configured libraries, else the default.
+        """
+        library = library or self._pinned_library
+        if library is None and self.router is not None:
+            library = self.router.choose(self._table.routes)
+        return self._table.route(library)
+
+    @active_library.setter
+    def active_library(self, library: Optional[str]):
+        if library is not None:
+            self._table.route(library)
+        self._pinned_library = library
+
+    def load_library(self, library: str) -> Any:
+        """Import (once) and return the module configured for a library; module_cache holds them by module name."""
+        if library not in self.config["libraries"]:
+            raise ValueError(f"Library '{library}' is not configured. Add it to config.yaml.")
+        module_name = self.config["libraries"][library]["module"]
         if module_name in self.module_cache:
             return self.module_cache[module_name]
-
         try:
-            module = importlib.import_module(module_name)
-            self.module_cache[module_name] = module
+            module = self.module_cache[module_name] = self._table.module(library)
             return module
         except ImportError:
             raise ImportError(f"Library '{module_name}' is not installed. Install it using 'pip install {module_name}'.")
 
+    def reload(self, config: Optional[Dict[str, Any]] = None) -> DispatchTable:
+        """
+        Compile a new config (re-read from config_path by default), importing
+        its modules up front only if the SDK was built with preload, and swap
+        it in. An invalid config raises ConfigError and leaves the current
+        table in place. Cached clients of libraries whose entry changed are
+        retired: dropped from the cache now and closed by a timer once
+        retire_grace has passed, so in-flight calls finish. New or changed
+        entries must name a module that can be found, so a misspelled module
+        is rejected even without preload. A changed `http:` section replaces
+        the SDK's own SharedTransports and retires the old one along with
+        every cached client holding it; it is ignored when transports were
+        passed in.
+        """
+        if config is None:
+            config = self._read_config()
+        table = compile_config(config, self, preload=self.preload, version=self._table.version + 1,
+                               known=self._table.config["libraries"])
+        http = table.config.get("http", {})
+        transports = self.transports
+        http_changed = not self._external_transports and http != self._table.config.get("http", {})
+        if http_changed:
+            transports = self._configure_transports(http or {}) if http is not False else None
+        if table.config.get("routing") is not None:
+            self.router = self._configure_router(table.config["routing"])
+        with self._lock:
+            old, self._table = self._table, table
+            for library in list(self.clients):
+                if http_changed or old.config["libraries"].get(library) != table.config["libraries"].get(library):
+                    self._retire(self.clients.pop(library)[1])
+            if http_changed:
+                if self._owns_transports:
+                    self._retire(self.transports)
+                self.transports = transports
+                self._owns_transports = transports is not None
+            self.reloads += 1
+        self.close_retired()
+        return table
+
+    def watch(self, interval: float = 1.0) -> ConfigWatcher:
+        """Reload whenever config_path changes on disk, checking every `interval` seconds."""
+        if self._watcher is None:
+            self._watcher = ConfigWatcher(self.config_path, self.reload, interval)
+        return self._watcher
+
+    def _retire(self, client: Any):
+        """Queue a client to be closed after retire_grace; call with _lock held."""
+        self._retired.append((time.monotonic() + self.retire_grace, client))
+        if self._retire_timer is None:
+            self._schedule_close_retired(self.retire_grace)
+
+    def _schedule_close_retired(self, delay: float):
+        # One daemon timer at a time; close_retired re-arms it for whatever is still waiting
+        timer = self._retire_timer = threading.Timer(delay, self._close_retired_later)
+        timer.daemon = True
+        timer.start()
+
+    def _close_retired_later(self):
+        with self._lock:
+            self._retire_timer = None
+        self.close_retired()
+
+    def close_retired(self, force: bool = False):
+        """Close retired clients whose grace period is over (all of them with force)."""
+        now = time.monotonic()
+        with self._lock:
+            due = [client for deadline, client in self._retired if force or deadline <= now]
+            self._retired = [(deadline, client) for deadline, client in self._retired
+                             if not (force or deadline <= now)]
+            if self._retired and self._retire_timer is None:
+                self._schedule_close_retired(max(0.0, min(deadline for deadline, _ in self._retired) - now))
+        for client in due:
+            close_client(client)
+
+    def client_args(self, library: str, defaults: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Constructor arguments for a library's client: config overrides the defaults."""
+        return {**(defaults or {}), **self.config["libraries"][library].get("client_args", {})}
+
+    def get_client(self, library: str, build: Callable[..., Any], args: Dict[str, Any],
+                   host: Optional[str] = None) -> Any:
+        """
+        Return the cached client for (library, args), calling build(**args)
+        on first use or after args changed. The replaced client is retired.
+        Clients that accept an HTTP client or session get the shared one for
+        their host (from a URL in args, else `host`).
+        """
+        if not self.cache_clients:
+            return build(**self._with_transport(library, build, args, host))
+        key = _freeze(args)
+        cached = self.clients.get(library)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        with self._lock:
+            cached = self.clients.get(library)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+            client = build(**self._with_transport(library, build, args, host))
+            self.clients[library] = (key, client)
+            if cached is not None:
+                self._retire(cached[1])
+        return client
+
+    def _with_transport(self, library: str, build: Callable[..., Any], args: Dict[str, Any],
+                        host: Optional[str]) -> Dict[str, Any]:
+        if self.transports is None or self.config["libraries"][library].get("shared_http") is False:
+            return args
+        return self.transports.inject(build, args, host)
+
+    def _cache_config(self, route: Route) -> Optional[Dict[str, Any]]:
+        """Model config the cache keys on, or None when the library is not cached."""
+        cache = self.cache
+        if cache is None or not route.entry.get("cache", True) or not cache.enabled(route.library):
+            return None
+        return {k: v for k, v in route.entry.items() if k != "cache"}
+
+    def enable_batching(self, library: str, max_batch_size: int = 32, max_wait: float = 0.01,
+                        max_in_flight: int = 2, adaptive: bool = True) -> MicroBatcher:
+        """
+        Coalesce concurrent invoke/ainvoke calls to `library` into batch()
+        calls of up to max_batch_size queries, waiting at most max_wait
+        seconds for a batch to fill. Worth it for libraries with a native
+        batch call (batch_* or batch_method); others just fan out again.
+        """
+        self._table.route(library)
+
+        def run_batch(queries):
+            route = self._table.route(library)
+            with self._tracked(route):
+                if route.batch is not None:
+                    return route.batch(queries, library, len(queries))
+                return self._fan_out(queries, library, len(queries))
+
+        batcher = MicroBatcher(run_batch, max_batch_size, max_wait, max_in_flight, adaptive)
+        old = self.batchers.get(library)
+        self.batchers[library] = batcher
+        if old is not None:
+            old.close()
+        return batcher
+
+    def disable_batching(self, library: str):
+        batcher = self.batchers.pop(library, None)
+        if batcher is not None:
+            batcher.close()
+
+    def _call(self, route: Route, query: str) -> Any:
+        batcher = self.batchers.get(route.library)
+        if batcher is not None:
+            return batcher.submit(query)
+        return self._invoke_route(route, query)
+
+    async def _acall(self, route: Route, query: str) -> Any:
+        batcher = self.batchers.get(route.library)
+        if batcher is not None:
+            return await batcher.asubmit(query)
+        return await self._ainvoke_route(route, query)
+
     def invoke(self, query: str, library: Optional[str] = None) -> Any:
-        """Dynamically invoke the function of the selected library."""
-        library = library or self.active_library
-        library_info = self.config["libraries"].get(library)
-        
-        if not library_info:
-            raise ValueError(f"Library '{library}' is not supported. Add it in config.yaml.")
-
-        # Dynamically call the correct function
-        invoke_function_name = library_info["invoke_function"]
-        if hasattr(self, invoke_function_name):
-            return getattr(self, invoke_function_name)(query)
+        """Send a query to the given library, or to the active one."""
+        route = self._route(library)
+        if self.middleware:
+            return self.middleware.invoke(Call(route.library, "invoke", (query,), target=route, config=route.entry))
+        return self._invoke_cached(route, query)
+
+    def _invoke_call(self, call: Call) -> Any:
+        if call.method == "batch":
+            return self._batch_route(call.target, *call.args, **call.kwargs)
+        if call.method == "stream":
+            return _primed(self._open_stream(call.target, call.args[0]))
+        return self._invoke_cached(call.target, call.args[0])
+
+    def _invoke_cached(self, route: Route, query: str) -> Any:
+        model_config = self._cache_config(route)
+        if model_config is None:
+            return self._call(route, query)
+        key = self.cache.key(route.library, model_config, query)
+        result = self.cache.get(key)
+        if result is MISS:
+            started = time.perf_counter()
+            result = self._call(route, query)
+            self.cache.set(key, result, time.perf_counter() - started)
+        return result
+
+    def _invoke_route(self, route: Route, query: str) -> Any:
+        if self.router is None:
+            return route.invoke(query, route.library)
+        with self.router.track(route.library):
+            return route.invoke(query, route.library)
+
+    async def _ainvoke_route(self, route: Route, query: str) -> Any:
+        if self.router is None:
+            return await self._ainvoke_backend(route, query)
+        with self.router.track(route.library):
+            return await self._ainvoke_backend(route, query)
+
+    async def _ainvoke_backend(self, route: Route, query: str) -> Any:
+        if route.ainvoke is not None:
+            return await route.ainvoke(query, route.library)
+        return await asyncio.to_thread(route.invoke, query, route.library)
+
+    async def ainvoke(self, query: str, library: Optional[str] = None) -> Any:
+        """Async invoke: the backend's async call if it has one, else invoke() in a worker thread."""
+        route = self._route(library)
+        if self.middleware:
+            return await self.middleware.ainvoke(Call(route.library, "ainvoke", (query,), target=route, config=route.entry))
+        return await self._ainvoke_cached(route, query)
+
+    async def _ainvoke_call(self, call: Call) -> Any:
+        if call.method == "abatch":
+            return await self._abatch_route(call.target, *call.args, **call.kwargs)
+        if call.method == "astream":
+            return await _aprimed(self._aopen_stream(call.target, call.args[0]))
+        return await self._ainvoke_cached(call.target, call.args[0])
+
+    async def _ainvoke_cached(self, route: Route, query: str) -> Any:
+        model_config = self._cache_config(route)
+        if model_config is None:
+            return await self._acall(route, query)
+        key = self.cache.key(route.library, model_config, query)
+        result = await self.cache.aget(key)
+        if result is MISS:
+            started = time.perf_counter()
+            result = await self._acall(route, query)
+            await self.cache.aset(key, result, time.perf_counter() - started)
+        return result
+
+    def _cache_lookup(self, route: Route, queries: List[str]):
+        """Split a batch into cached results and the indexes that still need the backend."""
+        model_config = self._cache_config(route)
+        if model_config is None:
+            return None, [None] * len(queries), list(range(len(queries)))
+        keys = [self.cache.key(route.library, model_config, query) for query in queries]
+        results = [self.cache.get(key) for key in keys]
+        return keys, results, [i for i, result in enumerate(results) if result is MISS]
+
+    def _cache_store(self, keys: Optional[List[str]], results: List[Any], pending: List[int],
+                     fresh: List[Any], elapsed: float):
+        for i, result in zip(pending, fresh):
+            results[i] = result
+            if keys is not None and not isinstance(result, BaseException):
+                self.cache.set(keys[i], result, elapsed / len(pending))
+
+    def batch(self, queries: List[str], library: Optional[str] = None, concurrency: int = 8,
+              return_exceptions: bool = True) -> List[Any]:
+        """
+        Invoke every query and return the results in input order. With
+        return_exceptions, a failed query yields its exception in place of a
+        result; otherwise the first failure is raised. Only cache misses are
+        sent to the backend.
+        """
+        route = self._route(library)
+        queries = list(queries)
+        if self.middleware:
+            return self.middleware.invoke(Call(route.library, "batch", (queries, concurrency, return_exceptions),
+                                               target=route, config=route.entry))
+        return self._batch_route(route, queries, concurrency, return_exceptions)
+
+    def _batch_route(self, route: Route, queries: List[str], concurrency: int, return_exceptions: bool) -> List[Any]:
+        keys, results, pending = self._cache_lookup(route, queries)
+        if pending:
+            misses = [queries[i] for i in pending]
+            started = time.perf_counter()
+            if route.batch is not None:
+                fresh = route.batch(misses, route.library, concurrency)
+            else:
+                fresh = self._fan_out(misses, route.library, concurrency)
+            self._cache_store(keys, results, pending, fresh, time.perf_counter() - started)
+        return _check_results(results, return_exceptions)
+
+    async def abatch(self, queries: List[str], library: Optional[str] = None, concurrency: int = 8,
+                     return_exceptions: bool = True) -> List[Any]:
+        """Async batch(), fanning out over ainvoke() when the backend has no native batch call."""
+        route = self._route(library)
+        queries = list(queries)
+        if self.middleware:
+            return await self.middleware.ainvoke(Call(route.library, "abatch", (queries, concurrency, return_exceptions),
+                                                      target=route, config=route.entry))
+        return await self._abatch_route(route, queries, concurrency, return_exceptions)
+
+    async def _abatch_route(self, route: Route, queries: List[str], concurrency: int,
+                            return_exceptions: bool) -> List[Any]:
+        if self._cache_config(route) is None:
+            keys, results, pending = self._cache_lookup(route, queries)
         else:
-            raise ValueError(f"Function '{invoke_function_name}' not found in SDK.")
+            keys, results, pending = await asyncio.to_thread(self._cache_lookup, route, queries)
+        if pending:
+            misses = [queries[i] for i in pending]
+            started = time.perf_counter()
+            if route.abatch is not None:
+                fresh = await route.abatch(misses, route.library, concurrency)
+            else:
+                fresh = await self._afan_out(misses, route.library, concurrency)
+            elapsed = time.perf_counter() - started
+            if keys is None:
+                self._cache_store(keys, results, pending, fresh, elapsed)
+            else:
+                await asyncio.to_thread(self._cache_store, keys, results, pending, fresh, elapsed)
+        return _check_results(results, return_exceptions)
 
-    # Dynamically defined methods for each library
-    def invoke_langchain(self, query: str):
-        """Invoke LangChain dynamically."""
-        from langchain.llms import OpenAI
-        llm = OpenAI(model_name="gpt-3.5-turbo")
-        return llm.predict(query)
+    def _tracked(self, route: Route):
+        return self.router.track(route.library) if self.router is not None else nullcontext()
 
-    def invoke_langgraph(self, query: str):
-        """Invoke LangGraph dynamically."""
-        return f"LangGraph executed query: {query}"
+    def stream(self, query: str, library: Optional[str] = None) -> TokenStream:
+        """
+        Stream the completion as text chunks. Libraries without a stream_*
+        method yield their whole invoke() result as a single chunk. The
+        returned TokenStream records time_to_first_token and total_time.
+        Middleware sees the call as method "stream" up to the first chunk
+        (see middleware.py).
+        """
+        route = self._route(library)
+
+        def source():
+            with self._tracked(route):
+                if self.middleware:
+                    yield from self.middleware.invoke(Call(route.library, "stream", (query,), target=route,
+                                                           config=route.entry))
+                else:
+                    yield from self._open_stream(route, query)
+
+        return TokenStream(source())
+
+    def _open_stream(self, route: Route, query: str) -> Iterator[Any]:
+        if route.stream is not None:
+            return iter(route.stream(query, route.library))
+        return iter([route.invoke(query, route.library)])
+
+    def astream(self, query: str, library: Optional[str] = None) -> TokenStream:
+        """
+        Async stream(): uses astream_* when the library has it, otherwise
+        pulls its sync stream_* from a worker thread, otherwise one chunk
+        from ainvoke. Middleware sees it as method "astream".
+        """
+        route = self._route(library)
+
+        async def source():
+            with self._tracked(route):
+                if self.middleware:
+                    chunks = await self.middleware.ainvoke(Call(route.library, "astream", (query,), target=route,
+                                                                config=route.entry))
+                else:
+                    chunks = self._aopen_stream(route, query)
+                async for chunk in chunks:
+                    yield chunk
+
+        return TokenStream(source())
+
+    async def _aopen_stream(self, route: Route, query: str) -> AsyncIterator[Any]:
+        if route.astream is not None:
+            async for chunk in route.astream(query, route.library):
+                yield chunk
+        elif route.stream is not None:
+            chunks = await asyncio.to_thread(lambda: iter(route.stream(query, route.library)))
+            while (chunk := await asyncio.to_thread(next, chunks, _END)) is not _END:
+                yield chunk
+        else:
+            yield await self._ainvoke_backend(route, query)
+
+    def _langchain_llm(self, library: str) -> Any:
+        llms = self.load_library(library)
+        return self.get_client(library, llms.OpenAI, self.client_args(library, {"model_name": "gpt-3.5-turbo"}),
+                               host="api.openai.com")
+
+    def invoke_langchain(self, query: str, library: str = "langchain") -> Any:
+        return self._langchain_llm(library).predict(query)
+
+    async def ainvoke_langchain(self, query: str, library: str = "langchain") -> Any:
+        return await self._langchain_llm(library).apredict(query)
+
+    def batch_langchain(self, queries: List[str], library: str = "langchain", concurrency: int = 8) -> List[Any]:
+        return self._langchain_llm(library).batch(queries, config={"max_concurrency": concurrency},
+                                                   return_exceptions=True)
+
+    async def abatch_langchain(self, queries: List[str], library: str = "langchain",
+                               concurrency: int = 8) -> List[Any]:
+        return await self._langchain_llm(library).abatch(queries, config={"max_concurrency": concurrency},
+                                                          return_exceptions=True)
+
+    def stream_langchain(self, query: str, library: str = "langchain") -> Iterator[Any]:
+        return self._langchain_llm(library).stream(query)
+
+    def astream_langchain(self, query: str, library: str = "langchain") -> AsyncIterator[Any]:
+        return self._langchain_llm(library).astream(query)
 
-    def invoke_langsmith(self, query: str):
-        """Invoke LangSmith dynamically."""
-        from langsmith.client import LangSmith
-        client = LangSmith()
+    def _llamaindex_llm(self, library: str) -> Any:
+        llms = self.load_library(library)
+        return self.get_client(library, llms.OpenAI, self.client_args(library, {"model": "gpt-4"}),
+                               host="api.openai.com")
+
+    def invoke_llamaindex(self, query: str, library: str = "llamaindex") -> Any:
+        return self._llamaindex_llm(library).complete(query)
+
+    async def ainvoke_llamaindex(self, query: str, library: str = "llamaindex") -> Any:
+        return await self._llamaindex_llm(library).acomplete(query)
+
+    def stream_llamaindex(self, query: str, library: str = "llamaindex") -> Iterator[Any]:
+        return self._llamaindex_llm(library).stream_complete(query)
+
+    async def astream_llamaindex(self, query: str, library: str = "llamaindex") -> AsyncIterator[Any]:
+        async for chunk in await self._llamaindex_llm(library).astream_complete(query):
+            yield chunk
+
+    def invoke_langsmith(self, query: str, library: str = "langsmith") -> Any:
+        client_module = self.load_library(library)
+        client = self.get_client(library, client_module.LangSmith, self.client_args(library),
+                                 host="api.smith.langchain.com")
         return client.log({"query": query})
 
-    def invoke_llamaindex(self, query: str):
-        """Invoke LlamaIndex dynamically."""
-        from llama_index.llms import OpenAI
-        llm = OpenAI(model="gpt-4")
-        return llm.complete(query)
+    def invoke_langgraph(self, query: str, library: str = "langgraph") -> Any:
+        """Invoke LangGraph dynamically."""
+        return f"LangGraph executed query: {query}"
 
-    def invoke_haystack(self, query: str):
+    def invoke_haystack(self, query: str, library: str = "haystack") -> Any:
         """Invoke Haystack dynamically."""
         return f"Haystack executed query: {query}"
 
+    def _configured_client(self, library: str) -> Any:
+        client_class = getattr(self.load_library(library), self.config["libraries"][library]["client_class"])
+        return self.get_client(library, client_class, self.client_args(library))
+
+    def invoke_client(self, query: str, library: str) -> Any:
+        """
+        Generic entry for libraries configured with `client_class` and an
+        optional `method` (default "invoke") instead of a dedicated invoke_*.
+        `async_method`, `batch_method`, `stream_method` and `astream_method`
+        name the client's native async, batch and streaming calls, when it
+        has them.
+        """
+        method = self.config["libraries"][library].get("method", "invoke")
+        return getattr(self._configured_client(library), method)(query)
+
+    async def ainvoke_client(self, query: str, library: str) -> Any:
+        method = self.config["libraries"][library].get("async_method")
+        if method is None:
+            return await asyncio.to_thread(self.invoke_client, query, library)
+        return await getattr(self._configured_client(library), method)(query)
+
+    def batch_client(self, queries: List[str], library: str, concurrency: int = 8) -> List[Any]:
+        method = self.config["libraries"][library].get("batch_method")
+        if method is None:
+            return self._fan_out(queries, library, concurrency)
+        return _native_batch(getattr(self._configured_client(library), method), queries)
+
+    def stream_client(self, query: str, library: str) -> Iterator[Any]:
+        method = self.config["libraries"][library].get("stream_method")
+        if method is None:
+            return iter([self.invoke_client(query, library)])
+        return getattr(self._configured_client(library), method)(query)
+
+    async def astream_client(self, query: str, library: str) -> AsyncIterator[Any]:
+        entry = self.config["libraries"][library]
+        if entry.get("astream_method") is not None:
+            async for chunk in getattr(self._configured_client(library), entry["astream_method"])(query):
+                yield chunk
+        elif entry.get("stream_method") is not None:
+            chunks = await asyncio.to_thread(self.stream_client, query, library)
+            while (chunk := await asyncio.to_thread(next, chunks, _END)) is not _END:
+                yield chunk
+        else:
+            yield await self.ainvoke_client(query, library)
+
+    async def abatch_client(self, queries: List[str], library: str, concurrency: int = 8) -> List[Any]:
+        method = self.config["libraries"][library].get("batch_method")
+        if method is None:
+            return await self._afan_out(queries, library, concurrency)
+        batch_call = getattr(self._configured_client(library), method)
+        return await asyncio.to_thread(_native_batch, batch_call, queries)
+
+    async def _afan_out(self, queries: List[str], library: str, concurrency: int) -> List[Any]:
+        route = self._table.route(library)
+        slots = asyncio.Semaphore(concurrency)
+
+        async def run(query):
+            async with slots:
+                return await self._ainvoke_route(route, query)
+
+        return await asyncio.gather(*(run(query) for query in queries), return_exceptions=True)
+
+    def _fan_out(self, queries: List[str], library: str, concurrency: int) -> List[Any]:
+        route = self._table.route(library)
+
+        def run(query):
+            try:
+                return self._invoke_route(route, query)
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(queries)))) as executor:
+            return list(executor.map(run, queries))
+
+    def close(self):
+        """Stop watching the config and close every cached backend client; they are rebuilt if invoked again."""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        for library in list(self.batchers):
+            self.disable_batching(library)
+        with self._lock:
+            clients = [client for _, client in self.clients.values()]
+            self.clients.clear()
+        for client in clients:
+            close_client(client)
+        self.close_retired(force=True)
+        with self._lock:
+            timer, self._retire_timer = self._retire_timer, None
+        if timer is not None:
+            timer.cancel()
+        if self.cache is not None:
+            self.cache.close()
+        if self._owns_transports:
+            self.transports.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
 # Example Usage
 if __name__ == "__main__":
     sdk = DynamicAISDK()
     response = sdk.invoke("What is Generative AI?", library="langchain")
-    print(response)
\ No newline at end of file
+    print(response)
@@ -0,0 +1,146 @@
+import time
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+class MicroBatcher:
+    """
+    Coalesces single calls from many threads into batched backend calls.
+    submit(item) blocks until batch_fn(items) has run on a batch containing
+    the item and returns that item's result; a result that is an exception
+    is raised to its caller only.
+
+    The window adapts to load. From the EWMA arrival rate and batch latency
+    it targets as many items as arrive while a batch slot frees up (Little's
+    law over max_in_flight concurrent batches), capped at max_batch_size,
+    and waits only as long as that takes, capped at max_wait. Under light
+    load the target is one item and requests are sent without delay.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], max_batch_size: int = 32,
+                 max_wait: float = 0.01, max_in_flight: int = 2, adaptive: bool = True, alpha: float = 0.2):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.adaptive = adaptive
+        self.alpha = alpha
+        self.max_in_flight = max_in_flight
+        self.arrival_gap = None
+        self.batch_latency = None
+        self.batches = 0
+        self.items = 0
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._last_arrival = None
+        self._closed = False
+        self._slots = threading.Semaphore(max_in_flight)
+        self._executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="microbatch")
+        self._thread = threading.Thread(target=self._collect, name="microbatch-collector", daemon=True)
+        self._thread.start()
+
+    def submit_future(self, item: Any) -> Future:
+        future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed.")
+            now = time.monotonic()
+            if self._last_arrival is not None:
+                gap = now - self._last_arrival
+                self.arrival_gap = gap if self.arrival_gap is None else (
+                    self.arrival_gap + self.alpha * (gap - self.arrival_gap))
+            self._last_arrival = now
+            self._queue.append((item, future))
+            self._cond.notify()
+        return future
+
+    def submit(self, item: Any, timeout: Optional[float] = None) -> Any:
+        return self.submit_future(item).result(timeout)
+
+    async def asubmit(self, item: Any) -> Any:
+        return await asyncio.wrap_future(self.submit_future(item))
+
+    @property
+    def arrival_rate(self) -> float:
+        """Items per second, from the EWMA of the gaps between submits."""
+        if self.arrival_gap is None:
+            return 0.0
+        return 1.0 / max(self.arrival_gap, 1e-6)
+
+    def _window(self):
+        """(target batch size, seconds to wait for it) under the current load."""
+        if not self.adaptive:
+            return self.max_batch_size, self.max_wait
+        rate = self.arrival_rate
+        if rate <= 0.0 or self.batch_latency is None:
+            return 1, 0.0
+        # With max_in_flight batches running, a slot frees up every batch_latency / max_in_flight
+        target = min(self.max_batch_size, max(1, int(rate * self.batch_latency / self.max_in_flight)))
+        if target == 1:
+            return 1, 0.0
+        return target, min(self.max_wait, target / rate)
+
+    def _collect(self):
+        while True:
+            # Take a slot first, so items arriving while all batches are busy join the next one
+            self._slots.acquire()
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    self._slots.release()
+                    return
+                target, wait = self._window()
+                deadline = time.monotonic() + wait
+                while len(self._queue) < target and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.max_batch_size))]
+            self._executor.submit(self._run, batch)
+
+    def _run(self, batch):
+        started = time.monotonic()
+        try:
+            results = list(self.batch_fn([item for item, _ in batch]))
+            if len(results) != len(batch):
+                raise RuntimeError(f"Batch call returned {len(results)} results for {len(batch)} items.")
+        except BaseException as e:
+            results = [e] * len(batch)
+        finally:
+            self._slots.release()
+        elapsed = time.monotonic() - started
+        with self._cond:
+            self.batches += 1
+            self.items += len(batch)
+            self.batch_latency = elapsed if self.batch_latency is None else (
+                self.batch_latency + self.alpha * (elapsed - self.batch_latency))
+        for (_, future), result in zip(batch, results):
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            target, wait = self._window()
+            return {
+                "batches": self.batches,
+                "items": self.items,
+                "avg_batch_size": self.items / self.batches if self.batches else 0.0,
+                "queued": len(self._queue),
+                "arrival_rate": self.arrival_rate,
+                "batch_latency": self.batch_latency,
+                "target_batch_size": target,
+                "wait": wait,
+            }
+
+    def close(self):
+        """Flush queued items, wait for running batches and stop the worker threads."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self._executor.shutdown(wait=True)
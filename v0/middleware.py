@@ -0,0 +1,302 @@
+import math
+import time
+import random
+import threading
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple, Type
+
+if TYPE_CHECKING:
+    from invoke_cache import InvokeCache
+
+class Call:
+    """
+    One SDK invocation as seen by middleware: which library, which method,
+    with what arguments. For DynamicAISDK stream/astream calls, next(call)
+    returns the chunk iterator once its first chunk has arrived, so timing,
+    in-flight and retries cover the stream up to its first chunk.
+    """
+
+    __slots__ = ("library", "method", "args", "kwargs", "target", "config", "attempt")
+
+    def __init__(self, library: str, method: str, args: Tuple[Any, ...] = (), kwargs: Optional[Dict[str, Any]] = None,
+                 target: Any = None, config: Optional[Dict[str, Any]] = None):
+        self.library = library
+        self.method = method
+        self.args = args
+        self.kwargs = kwargs or {}
+        # SDK-specific handle (the resolved route for DynamicAISDK)
+        self.target = target
+        # What the library resolves to (config entry, client class and args); changes when it is reconfigured
+        self.config = config or {}
+        self.attempt = 0
+
+
+class Middleware:
+    """
+    Base class. Override invoke(call, next) and/or ainvoke(call, next); call
+    next(call) (or await it) to continue down the chain, or return without
+    calling it to short-circuit. The defaults pass straight through.
+    """
+
+    def invoke(self, call: Call, next: Callable[[Call], Any]) -> Any:
+        return next(call)
+
+    async def ainvoke(self, call: Call, next: Callable[[Call], Awaitable[Any]]) -> Any:
+        return await next(call)
+
+
+class Pipeline:
+    """
+    Ordered middleware chain around an SDK's terminal handlers. The chain is
+    composed once whenever middleware is added or removed, so a call pays
+    one closure per middleware; with none installed the SDK skips the
+    pipeline entirely (`if sdk.middleware:`).
+    """
+
+    def __init__(self, handler: Callable[[Call], Any], ahandler: Callable[[Call], Awaitable[Any]],
+                 middlewares: Iterable[Middleware] = ()):
+        self._handler = handler
+        self._ahandler = ahandler
+        self.middlewares = list(middlewares)
+        self._compose()
+
+    def _compose(self):
+        chain, achain = self._handler, self._ahandler
+        # The first middleware added is the outermost
+        for middleware in reversed(self.middlewares):
+            chain = _bind(middleware.invoke, chain)
+            achain = _bind(middleware.ainvoke, achain)
+        self.invoke, self.ainvoke = chain, achain
+
+    def add(self, middleware: Middleware) -> Middleware:
+        self.middlewares.append(middleware)
+        self._compose()
+        return middleware
+
+    def remove(self, middleware: Middleware):
+        self.middlewares.remove(middleware)
+        self._compose()
+
+    def __bool__(self) -> bool:
+        return bool(self.middlewares)
+
+def _bind(layer, next):
+    return lambda call: layer(call, next)
+
+
+class LatencyHistogram:
+    """
+    Fixed log-spaced buckets (about 10% wide) from 100 microseconds to ten
+    minutes; constant memory and good enough for p50/p95/p99.
+    """
+
+    MIN = 1e-4
+    GROWTH = 1.1
+
+    def __init__(self):
+        self._buckets = [0] * (int(math.log(600 / self.MIN, self.GROWTH)) + 2)
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        index = 0 if seconds <= self.MIN else min(len(self._buckets) - 1,
+                                                  int(math.log(seconds / self.MIN, self.GROWTH)) + 1)
+        with self._lock:
+            self._buckets[index] += 1
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Upper bound of the bucket holding the pct-th percentile, in seconds."""
+        with self._lock:
+            if not self.count:
+                return None
+            rank = pct / 100.0 * self.count
+            seen = 0
+            for index, count in enumerate(self._buckets):
+                seen += count
+                if seen >= rank and count:
+                    return min(self.max, self.MIN * self.GROWTH ** index)
+            return self.max
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else None,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max if self.count else None,
+        }
+
+
+class TimingMiddleware(Middleware):
+    """Per-library latency histograms of every call, successful or not."""
+
+    def __init__(self):
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, library: str) -> LatencyHistogram:
+        histogram = self.histograms.get(library)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(library, LatencyHistogram())
+        return histogram
+
+    def invoke(self, call, next):
+        started = time.perf_counter()
+        try:
+            return next(call)
+        finally:
+            self.histogram(call.library).record(time.perf_counter() - started)
+
+    async def ainvoke(self, call, next):
+        started = time.perf_counter()
+        try:
+            return await next(call)
+        finally:
+            self.histogram(call.library).record(time.perf_counter() - started)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {library: histogram.snapshot() for library, histogram in list(self.histograms.items())}
+
+
+class InFlightMiddleware(Middleware):
+    """Gauge of calls currently running, per library, with the peak seen."""
+
+    def __init__(self):
+        self.current: Dict[str, int] = {}
+        self.peak: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _enter(self, library):
+        with self._lock:
+            value = self.current[library] = self.current.get(library, 0) + 1
+            if value > self.peak.get(library, 0):
+                self.peak[library] = value
+
+    def _exit(self, library):
+        with self._lock:
+            self.current[library] -= 1
+
+    def invoke(self, call, next):
+        self._enter(call.library)
+        try:
+            return next(call)
+        finally:
+            self._exit(call.library)
+
+    async def ainvoke(self, call, next):
+        self._enter(call.library)
+        try:
+            return await next(call)
+        finally:
+            self._exit(call.library)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {library: {"in_flight": self.current[library], "peak": self.peak[library]}
+                    for library in self.current}
+
+
+class RetryMiddleware(Middleware):
+    """
+    Retries calls that raise one of `retry_on`, up to max_retries times,
+    sleeping with full-jitter exponential backoff between attempts.
+    call.attempt counts the retries made so far.
+    """
+
+    def __init__(self, max_retries: int = 2, backoff_base: float = 0.2, backoff_max: float = 5.0,
+                 retry_on: Tuple[Type[BaseException], ...] = (Exception,)):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_on = retry_on
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def _retried(self, call: Call):
+        call.attempt += 1
+        with self._lock:
+            self.retries += 1
+
+    def invoke(self, call, next):
+        while True:
+            try:
+                return next(call)
+            except self.retry_on:
+                if call.attempt >= self.max_retries:
+                    raise
+            time.sleep(self.backoff(call.attempt))
+            self._retried(call)
+
+    async def ainvoke(self, call, next):
+        while True:
+            try:
+                return await next(call)
+            except self.retry_on:
+                if call.attempt >= self.max_retries:
+                    raise
+            import asyncio
+            await asyncio.sleep(self.backoff(call.attempt))
+            self._retried(call)
+
+
+class CacheMiddleware(Middleware):
+    """
+    Serves repeated calls from an InvokeCache, keyed like InvokeCache itself
+    by library and resolved config (so a reload or re-registration with new
+    client args or model starts fresh), plus method and arguments (a single
+    string argument is normalized like a query). An async call shares
+    entries with its sync counterpart: ainvoke with invoke, apredict with
+    predict. A config entry with `cache: false` is never cached, and neither
+    are streams.
+    """
+
+    def __init__(self, cache: Optional["InvokeCache"] = None):
+        # Imported here so loading middleware.py does not pull in sqlite3 and pickle
+        from invoke_cache import MISS, InvokeCache
+        self.cache = cache if cache is not None else InvokeCache()
+        self._miss = MISS
+
+    def key(self, call: Call, method: Optional[str] = None) -> Optional[str]:
+        if not self.cache.enabled(call.library) or call.config.get("cache", True) is False:
+            return None
+        if call.method in ("stream", "astream"):
+            return None
+        if len(call.args) == 1 and isinstance(call.args[0], str):
+            query, rest = call.args[0], ()
+        else:
+            query, rest = "", call.args
+        config = {k: v for k, v in call.config.items() if k != "cache"}
+        return self.cache.key(call.library, {"config": config, "method": method or call.method, "args": rest,
+                                             "kwargs": call.kwargs}, query)
+
+    def invoke(self, call, next):
+        key = self.key(call)
+        if key is None:
+            return next(call)
+        result = self.cache.get(key)
+        if result is self._miss:
+            started = time.perf_counter()
+            result = next(call)
+            self.cache.set(key, result, time.perf_counter() - started)
+        return result
+
+    async def ainvoke(self, call, next):
+        # Async methods carry the usual "a" prefix; drop it so sync and async calls share results
+        key = self.key(call, call.method[1:] if call.method.startswith("a") else call.method)
+        if key is None:
+            return await next(call)
+        result = await self.cache.aget(key)
+        if result is self._miss:
+            started = time.perf_counter()
+            result = await next(call)
+            await self.cache.aset(key, result, time.perf_counter() - started)
+        return result
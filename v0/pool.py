@@ -0,0 +1,203 @@
+import gc
+import sys
+import time
+import types
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+def close_client(client: Any):
+    """Call a client's close() or aclose(), whichever it has, and wait for it."""
+    for method_name in ("close", "aclose"):
+        method = getattr(client, method_name, None)
+        if callable(method):
+            result = method()
+            if hasattr(result, "__await__"):
+                # asyncio is costly to import; only clients with async close methods need it
+                import asyncio
+                try:
+                    loop = asyncio.get_running_loop()
+                except RuntimeError:
+                    asyncio.run(_await(result))
+                else:
+                    # Already inside a loop on this thread: let it finish in the background
+                    loop.create_task(_await(result))
+            return
+
+async def _await(awaitable):
+    return await awaitable
+
+_SHARED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+def estimate_size(obj: Any, max_objects: int = 200_000) -> int:
+    """
+    Rough deep size of a client in bytes: the object and everything reachable
+    from it, skipping modules, classes and functions (shared, not owned).
+    Stops counting after max_objects objects so huge graphs stay cheap.
+    """
+    seen = set()
+    stack = [obj]
+    total = 0
+    while stack and len(seen) < max_objects:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, _SHARED):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current, 0)
+        stack.extend(gc.get_referents(current))
+    return total
+
+
+class PoolTimeout(TimeoutError):
+    """Raised when no instance could be checked out within the timeout."""
+
+
+class ClientPool:
+    """
+    Bounded pool of client instances for libraries that are not thread-safe
+    or serialize on internal locks. Instances are built on demand up to
+    `max_size`, kept warm down to `min_size`, and closed after sitting idle
+    for `idle_timeout` seconds. Idle eviction runs opportunistically on
+    checkout/checkin and can be triggered with evict_idle().
+    """
+
+    def __init__(self, factory: Callable[[], Any], max_size: int, min_size: int = 0,
+                 idle_timeout: Optional[float] = None, close: Callable[[Any], None] = close_client):
+        if max_size < 1 or min_size > max_size:
+            raise ValueError("Pool sizes must satisfy 0 <= min_size <= max_size and max_size >= 1.")
+        self.factory = factory
+        self.max_size = max_size
+        self.min_size = min_size
+        self.idle_timeout = idle_timeout
+        self.close = close
+        self._idle = deque()
+        self._size = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self.checkouts = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.created = 0
+        self.evicted = 0
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """Take an idle instance, build a new one if under max_size, or wait for a checkin."""
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        waited = False
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Pool is closed.")
+                if self._idle:
+                    # LIFO keeps recently used (warm) instances in play and lets the rest go idle
+                    instance, _ = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    instance = None
+                    break
+                waited = True
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise PoolTimeout(f"No client available within {timeout}s (pool size {self.max_size}).")
+                self._cond.wait(remaining)
+            self._record_wait(time.monotonic() - started, waited)
+
+        if instance is None:
+            try:
+                instance = self.factory()
+            except BaseException:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self.created += 1
+        self.evict_idle()
+        return instance
+
+    def _record_wait(self, seconds, waited):
+        self.checkouts += 1
+        if waited:
+            self.waits += 1
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def release(self, instance: Any, discard: bool = False):
+        """Return an instance; `discard` closes it instead, e.g. after it failed."""
+        with self._cond:
+            if discard or self._closed:
+                self._size -= 1
+            else:
+                self._idle.append((instance, time.monotonic()))
+            self._cond.notify()
+        if discard or self._closed:
+            self.close(instance)
+        self.evict_idle()
+
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = None):
+        instance = self.acquire(timeout)
+        try:
+            yield instance
+        finally:
+            self.release(instance)
+
+    def prefill(self, count: Optional[int] = None):
+        """Build instances until `count` (default min_size) exist."""
+        target = min(self.max_size, self.min_size if count is None else count)
+        built = []
+        while True:
+            with self._cond:
+                if self._size >= target:
+                    break
+            built.append(self.acquire())
+        for instance in built:
+            self.release(instance)
+
+    def evict_idle(self) -> int:
+        """Close instances idle for longer than idle_timeout, keeping at least min_size."""
+        if self.idle_timeout is None:
+            return 0
+        cutoff = time.monotonic() - self.idle_timeout
+        expired = []
+        with self._cond:
+            # The left end of the deque holds the longest-idle instances
+            while self._idle and self._idle[0][1] < cutoff and self._size > self.min_size:
+                expired.append(self._idle.popleft()[0])
+                self._size -= 1
+            self.evicted += len(expired)
+        for instance in expired:
+            self.close(instance)
+        return len(expired)
+
+    def close_all(self):
+        """Close idle instances now; checked-out ones are closed as they come back."""
+        with self._cond:
+            self._closed = True
+            idle = [instance for instance, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for instance in idle:
+            self.close(instance)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "max_size": self.max_size,
+                "min_size": self.min_size,
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "wait_seconds": self.wait_seconds,
+                "avg_wait_seconds": self.wait_seconds / self.waits if self.waits else 0.0,
+                "max_wait_seconds": self.max_wait_seconds,
+                "created": self.created,
+                "evicted": self.evicted,
+            }
@@ -0,0 +1,152 @@
+import time
+import random
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional
+
+STRATEGIES = ("weighted_round_robin", "power_of_two", "least_outstanding")
+
+class BackendStats:
+    """
+    Live view of one backend: EWMA of latency and of the error rate (0..1)
+    over completed calls, and the number of calls currently in flight.
+    """
+
+    def __init__(self, alpha: float = 0.2):
+        self.alpha = alpha
+        self.latency = None
+        self.error_rate = 0.0
+        self.outstanding = 0
+        self.calls = 0
+        self.errors = 0
+        self.last_finished = 0.0
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            self.outstanding += 1
+
+    def finish(self, seconds: float, ok: bool):
+        with self._lock:
+            self.outstanding -= 1
+            self.calls += 1
+            self.last_finished = time.monotonic()
+            if not ok:
+                self.errors += 1
+            # Failures often return fast; only successes move the latency estimate
+            if ok:
+                self.latency = seconds if self.latency is None else self.latency + self.alpha * (seconds - self.latency)
+            self.error_rate += self.alpha * ((0.0 if ok else 1.0) - self.error_rate)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"ewma_latency": self.latency, "error_rate": self.error_rate, "outstanding": self.outstanding,
+                    "calls": self.calls, "errors": self.errors}
+
+
+class Router:
+    """
+    Picks a library per call from live BackendStats.
+
+    - weighted_round_robin: smooth WRR, each backend weighted by its static
+      weight over its expected cost (EWMA latency inflated by error rate).
+    - power_of_two: two random candidates, the cheaper one wins, where cost
+      also grows with calls in flight.
+    - least_outstanding: fewest calls in flight, EWMA latency breaks ties.
+
+    Backends whose error rate exceeds `max_error_rate` are skipped while any
+    healthy one is left, except for a probe once `probe_interval` seconds
+    have passed since their last call, so a recovered backend comes back.
+    Backends without samples yet are treated as the fastest known so they
+    get explored.
+    """
+
+    def __init__(self, strategy: str = "power_of_two", libraries: Optional[Iterable[str]] = None,
+                 weights: Optional[Dict[str, float]] = None, alpha: float = 0.2, max_error_rate: float = 0.5,
+                 probe_interval: float = 5.0, seed: Optional[int] = None):
+        self.alpha = alpha
+        self.max_error_rate = max_error_rate
+        self.probe_interval = probe_interval
+        self.stats = {}
+        self._current = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.configure(strategy, libraries, weights)
+
+    def configure(self, strategy: str = "power_of_two", libraries: Optional[Iterable[str]] = None,
+                  weights: Optional[Dict[str, float]] = None):
+        """Change strategy or candidates; statistics gathered so far are kept."""
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown routing strategy '{strategy}', expected one of {STRATEGIES}.")
+        self.strategy = strategy
+        self.libraries = None if libraries is None else list(libraries)
+        self.weights = dict(weights or {})
+
+    def backend(self, library: str) -> BackendStats:
+        stats = self.stats.get(library)
+        if stats is None:
+            with self._lock:
+                stats = self.stats.setdefault(library, BackendStats(self.alpha))
+        return stats
+
+    def _healthy(self, stats: BackendStats, now: float) -> bool:
+        return stats.error_rate <= self.max_error_rate or now - stats.last_finished >= self.probe_interval
+
+    def _cost(self, library: str, default_latency: float, in_flight: bool) -> float:
+        stats = self.backend(library)
+        latency = default_latency if stats.latency is None else stats.latency
+        cost = latency / max(1.0 - stats.error_rate, 0.05)
+        return cost * (1 + stats.outstanding) if in_flight else cost
+
+    def choose(self, available: Iterable[str]) -> str:
+        """Pick one of `available` (the configured libraries), limited to self.libraries if set."""
+        candidates = [lib for lib in available if self.libraries is None or lib in self.libraries]
+        if not candidates:
+            raise ValueError("No configured library is available for routing.")
+        now = time.monotonic()
+        healthy = [lib for lib in candidates if self._healthy(self.backend(lib), now)]
+        candidates = healthy or candidates
+        if len(candidates) == 1:
+            return candidates[0]
+        known = [self.stats[lib].latency for lib in candidates if self.stats[lib].latency is not None]
+        default_latency = min(known) if known else 1.0
+
+        if self.strategy == "least_outstanding":
+            return min(candidates, key=lambda lib: (self.backend(lib).outstanding,
+                                                    self._cost(lib, default_latency, False)))
+        if self.strategy == "power_of_two":
+            first, second = self._random.sample(candidates, 2)
+            return min((first, second), key=lambda lib: self._cost(lib, default_latency, True))
+        return self._weighted_round_robin(candidates, default_latency)
+
+    def _weighted_round_robin(self, candidates: List[str], default_latency: float) -> str:
+        # nginx-style smooth WRR: deterministic, spreads picks evenly instead of in bursts
+        weights = {lib: self.weights.get(lib, 1.0) / max(self._cost(lib, default_latency, False), 1e-6)
+                   for lib in candidates}
+        total = sum(weights.values())
+        with self._lock:
+            for lib in candidates:
+                self._current[lib] = self._current.get(lib, 0.0) + weights[lib]
+            chosen = max(candidates, key=lambda lib: self._current[lib])
+            self._current[chosen] -= total
+        return chosen
+
+    @contextmanager
+    def track(self, library: str):
+        """Count a call as in flight and record its latency and outcome when it ends."""
+        stats = self.backend(library)
+        stats.start()
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        except GeneratorExit:
+            # A consumer closing a stream early is not a backend failure
+            ok = True
+            raise
+        finally:
+            stats.finish(time.perf_counter() - started, ok)
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        return {library: stats.snapshot() for library, stats in list(self.stats.items())}
@@ -0,0 +1,126 @@
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional, Union
+
+def normalize_chunk(chunk: Any) -> str:
+    """
+    Text of one streamed chunk, whatever the library yields: plain strings
+    (langchain LLMs), message chunks with .content (langchain chat models),
+    responses with .delta or .text (llama_index) and OpenAI-style
+    choices[0].delta.content, as objects or dicts.
+    """
+    if chunk is None:
+        return ""
+    if isinstance(chunk, str):
+        return chunk
+    if isinstance(chunk, dict):
+        if chunk.get("choices"):
+            choice = chunk["choices"][0]
+            return (choice.get("delta") or {}).get("content") or choice.get("text") or ""
+        for field in ("delta", "content", "text"):
+            if isinstance(chunk.get(field), str):
+                return chunk[field]
+        return ""
+    choices = getattr(chunk, "choices", None)
+    if choices:
+        delta = getattr(choices[0], "delta", None)
+        return getattr(delta, "content", None) or getattr(choices[0], "text", None) or ""
+    for field in ("delta", "content", "text"):
+        value = getattr(chunk, field, None)
+        if isinstance(value, str):
+            return value
+    return str(chunk)
+
+
+class TokenStream:
+    """
+    Iterator over the text chunks of one streamed completion, sync or async
+    depending on the source. Records time_to_first_token and total_time
+    (seconds since the stream was created) and keeps the chunks seen, so
+    .text is the completion so far. Empty chunks are dropped. Breaking out
+    early or calling close()/aclose() closes the underlying stream.
+    """
+
+    def __init__(self, source: Union[Iterator[Any], AsyncIterator[Any]]):
+        self._source = source
+        self._iterating = False
+        self.started = time.perf_counter()
+        self.time_to_first_token = None
+        self.total_time = None
+        self.chunks: List[str] = []
+        self.error = None
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+    def _record(self, chunk: Any) -> str:
+        text = normalize_chunk(chunk)
+        if text:
+            if self.time_to_first_token is None:
+                self.time_to_first_token = time.perf_counter() - self.started
+            self.chunks.append(text)
+        return text
+
+    def _finish(self, error: Optional[BaseException] = None):
+        if self.total_time is None:
+            self.total_time = time.perf_counter() - self.started
+            self.error = error
+
+    def _claim(self):
+        if self._iterating:
+            raise RuntimeError("A TokenStream can only be iterated once.")
+        self._iterating = True
+
+    def __iter__(self) -> Iterator[str]:
+        self._claim()
+        try:
+            for chunk in self._source:
+                text = self._record(chunk)
+                if text:
+                    yield text
+        except GeneratorExit:
+            self.close()
+            raise
+        except BaseException as e:
+            self._finish(e)
+            raise
+        self._finish()
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        self._claim()
+        try:
+            async for chunk in self._source:
+                text = self._record(chunk)
+                if text:
+                    yield text
+        except GeneratorExit:
+            await self.aclose()
+            raise
+        except BaseException as e:
+            self._finish(e)
+            raise
+        self._finish()
+
+    def close(self):
+        close = getattr(self._source, "close", None)
+        if close is not None:
+            close()
+        self._finish()
+
+    async def aclose(self):
+        aclose = getattr(self._source, "aclose", None)
+        if aclose is not None:
+            await aclose()
+        self._finish()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.aclose()
@@ -0,0 +1,190 @@
+import threading
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional
+
+from pool import close_client
+
+# Constructor parameters through which provider clients accept an HTTP client
+# or session: openai-based langchain and llama_index LLMs take httpx clients,
+# langsmith.Client a requests.Session.
+SYNC_PARAMS = ("http_client",)
+ASYNC_PARAMS = ("http_async_client", "async_http_client")
+SESSION_PARAMS = ("session",)
+
+# Client arguments that carry the endpoint, in order of preference
+URL_ARGS = ("base_url", "openai_api_base", "api_base", "api_url", "endpoint")
+
+def host_of(args: Dict[str, Any], default: Optional[str] = None) -> str:
+    """The host a client will talk to, from its URL argument if it has one."""
+    from urllib.parse import urlsplit
+    for name in URL_ARGS:
+        url = args.get(name)
+        if isinstance(url, str) and url:
+            return urlsplit(url if "//" in url else "//" + url).netloc or url
+    return default or "*"
+
+# The shared clients ignore close() from the provider clients holding them;
+# SharedTransports.close() calls close_shared() instead.
+
+@lru_cache(maxsize=None)
+def _httpx_classes():
+    import httpx
+
+    class SharedClient(httpx.Client):
+        def close(self):
+            pass
+
+        def close_shared(self):
+            httpx.Client.close(self)
+
+    class SharedAsyncClient(httpx.AsyncClient):
+        async def aclose(self):
+            pass
+
+        async def close_shared(self):
+            await httpx.AsyncClient.aclose(self)
+
+    return httpx, SharedClient, SharedAsyncClient
+
+@lru_cache(maxsize=None)
+def _requests_classes():
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    class SharedSession(requests.Session):
+        def close(self):
+            pass
+
+        def close_shared(self):
+            requests.Session.close(self)
+
+    return HTTPAdapter, SharedSession
+
+
+class SharedTransports:
+    """
+    One tuned HTTP client per host, shared by every provider client the SDK
+    builds, so they reuse sockets and TLS sessions and the limits below hold
+    across providers instead of per client instance:
+
+    - httpx.Client / httpx.AsyncClient with max_connections,
+      max_keepalive_connections and keepalive_expiry
+    - requests.Session with a blocking pool of max_connections per host
+
+    httpx and requests are optional; without them no client is injected and
+    the provider builds its own. Shared clients ignore close() from the
+    providers that hold them and are closed by close(). An async client is
+    bound to the event loop it first runs on, so use one SDK per loop.
+    """
+
+    def __init__(self, max_connections: int = 100, max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 30.0, timeout: float = 60.0, connect_timeout: float = 10.0,
+                 http2: bool = False):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.http2 = http2
+        self._clients = {}
+        self._signatures = {}
+        self._lock = threading.Lock()
+
+    def _shared(self, kind: str, host: str, build: Callable[[], Any]) -> Any:
+        key = (kind, host)
+        client = self._clients.get(key)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(key)
+                if client is None:
+                    client = self._clients[key] = build()
+        return client
+
+    def _httpx_options(self, httpx) -> Dict[str, Any]:
+        return {
+            "limits": httpx.Limits(max_connections=self.max_connections,
+                                   max_keepalive_connections=self.max_keepalive_connections,
+                                   keepalive_expiry=self.keepalive_expiry),
+            "timeout": httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            "http2": self.http2,
+        }
+
+    def httpx_client(self, host: str = "*") -> Any:
+        """Shared httpx.Client for `host`."""
+        httpx, client_class, _ = _httpx_classes()
+        return self._shared("httpx", host, lambda: client_class(**self._httpx_options(httpx)))
+
+    def httpx_async_client(self, host: str = "*") -> Any:
+        """Shared httpx.AsyncClient for `host`."""
+        httpx, _, client_class = _httpx_classes()
+        return self._shared("httpx_async", host, lambda: client_class(**self._httpx_options(httpx)))
+
+    def requests_session(self, host: str = "*") -> Any:
+        """Shared requests.Session for `host`, its pool capped at max_connections."""
+        adapter_class, session_class = _requests_classes()
+
+        def build():
+            session = session_class()
+            adapter = adapter_class(pool_connections=1, pool_maxsize=self.max_connections, pool_block=True)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            return session
+
+        return self._shared("requests", host, build)
+
+    def _accepted(self, build: Callable[..., Any]) -> frozenset:
+        accepted = self._signatures.get(build)
+        if accepted is None:
+            # Imported on first client build, not at startup (see bench_startup.py)
+            import inspect
+            try:
+                parameters = inspect.signature(build).parameters
+            except (TypeError, ValueError):
+                parameters = {}
+            # "session" is a common name; only fill it where a requests.Session is expected
+            accepted = self._signatures[build] = frozenset(
+                name for name, parameter in parameters.items()
+                if name not in SESSION_PARAMS or "requests" in str(parameter.annotation))
+        return accepted
+
+    def inject(self, build: Callable[..., Any], args: Dict[str, Any], host: Optional[str] = None) -> Dict[str, Any]:
+        """
+        `args` plus the shared clients for every HTTP client or session
+        parameter `build` accepts and the caller did not set. `host` is the
+        provider's default when args carry no URL.
+        """
+        accepted = self._accepted(build)
+        wanted = [(name, factory) for names, factory in ((SYNC_PARAMS, self.httpx_client),
+                                                         (ASYNC_PARAMS, self.httpx_async_client),
+                                                         (SESSION_PARAMS, self.requests_session))
+                  for name in names if name in accepted and name not in args]
+        if not wanted:
+            return args
+        host = host_of(args, host)
+        injected = dict(args)
+        for name, factory in wanted:
+            try:
+                injected[name] = factory(host)
+            except ImportError:
+                # Optional dependency missing: the provider falls back to its own client
+                pass
+        return injected
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "hosts": sorted({host for _, host in self._clients}),
+                "clients": sorted(f"{kind}:{host}" for kind, host in self._clients),
+                "max_connections": self.max_connections,
+                "max_keepalive_connections": self.max_keepalive_connections,
+            }
+
+    def close(self):
+        """Close every shared client; later injections build fresh ones."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            # close_client waits for the async client's coroutine too
+            close_client(SimpleNamespace(close=client.close_shared))